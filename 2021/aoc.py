@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import importlib
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Optional, Union
+
+import events
+
+
+FILE_PATH = Path(__file__)
+
+DAYS = tuple(range(1, 26))
+PARTS = (1, 2)
+
+
+class PartResult:
+    def __init__(self, day: int, part: int, answer: Union[int, str], wall_time: float, cpu_time: float, peak_memory: Optional[int]) -> None:
+        self.day = day
+        self.part = part
+        self.answer = answer
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.peak_memory = peak_memory
+
+    def __str__(self) -> str:
+        peak_memory_str = f"{self.peak_memory / (1024 * 1024):>10.1f}" if self.peak_memory is not None else f"{'-':>10}"
+        answer_str = str(self.answer)
+        if '\n' in answer_str:
+            answer_str = '\n' + answer_str
+        return f"{self.day:>3}  {self.part:>4}  {self.wall_time:>9.3f}  {self.cpu_time:>9.3f}  {peak_memory_str}  {answer_str}"
+
+
+def run_part(day: int, part: int, input_file_path: Optional[Path] = None, trace_memory: bool = True, verbosity: int = events.QUIET) -> Optional[PartResult]:
+    module = importlib.import_module(f'day_{day}')
+    solve_part = getattr(module, f'solve_part_{part}', None)
+    if solve_part is None:
+        return None
+    solve_args = (input_file_path,) if input_file_path else ()
+
+    def print_part_event(event: events.Event) -> None:
+        print(f"Day {day} part {part}:  {event}")
+
+    if verbosity:
+        events.add_event_handler(print_part_event, verbosity)
+    if trace_memory:
+        tracemalloc.start()
+    wall_start_time = time.perf_counter()
+    cpu_start_time = time.process_time()
+    answer = solve_part(*solve_args)
+    cpu_time = time.process_time() - cpu_start_time
+    wall_time = time.perf_counter() - wall_start_time
+    peak_memory = None
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if verbosity:
+        events.remove_event_handler(print_part_event)
+
+    return PartResult(day, part, answer, wall_time, cpu_time, peak_memory)
+
+
+def run_parts(days: list[int], parts: list[int], jobs: Optional[int] = None, trace_memory: bool = True, verbosity: int = events.QUIET) -> list[PartResult]:
+    day_parts = [(day, part) for day in days for part in parts]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            run_part,
+            [day for day, _ in day_parts],
+            [part for _, part in day_parts],
+            [None] * len(day_parts),
+            [trace_memory] * len(day_parts),
+            [verbosity] * len(day_parts)
+        )
+        return [result for result in results if result]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run Advent of Code 2021 solutions and time each part.")
+    parser.add_argument('days', metavar='DAY', type=int, nargs='*', default=DAYS, help="days to run (default: all)")
+    parser.add_argument('-p', '--part', type=int, choices=PARTS, action='append', dest='parts', help="part to run (default: both)")
+    parser.add_argument('-j', '--jobs', type=int, help="number of worker processes (default: CPU count)")
+    parser.add_argument('-v', '--verbose', action='count', default=events.QUIET, help="report progress (-v) or every detail (-vv) while solving")
+    parser.add_argument('--no-memory', action='store_true', help="don't trace peak memory, which slows allocation-heavy parts down")
+    args = parser.parse_args()
+
+    print("Day  Part   Wall (s)    CPU (s)  Peak (MB)  Answer")
+    wall_start_time = time.perf_counter()
+    for result in run_parts(args.days, args.parts or PARTS, args.jobs, trace_memory=not args.no_memory, verbosity=args.verbose):
+        print(result)
+    print(f"Total wall time:  {time.perf_counter() - wall_start_time:.3f} s")
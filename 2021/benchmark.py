@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+import argparse
+import importlib
+import json
+from pathlib import Path
+from random import Random
+import sys
+import tempfile
+from typing import Optional
+
+from aoc import DAYS, run_part
+from benchmark_inputs import INPUT_GENERATORS
+
+
+FILE_PATH = Path(__file__)
+RESULTS_FILE_PATH = FILE_PATH.parent / 'benchmark_results.json'
+BASELINE_FILE_PATH = FILE_PATH.parent / 'benchmark_baseline.json'
+
+
+class BenchmarkResult:
+    def __init__(self, day: int, part: int, size: int, wall_time: float, cpu_time: float) -> None:
+        self.day = day
+        self.part = part
+        self.size = size
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+
+    @property
+    def key(self) -> str:
+        return f"day_{self.day}_part_{self.part}_size_{self.size}"
+
+    def to_json(self) -> dict[str, float]:
+        return {
+            'day': self.day,
+            'part': self.part,
+            'size': self.size,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time
+        }
+
+
+def generate_input_file(day: int, size: int, directory: Path, seed: int = 2021) -> Path:
+    input_file_path = directory / f'day_{day}_size_{size}_input.txt'
+    input_file_path.write_text(INPUT_GENERATORS[day].generate(size, Random(seed)) + '\n')
+    return input_file_path
+
+
+def profile_part(day: int, part: int, input_file_path: Path) -> None:
+    # pprofile is a dev dependency, so only require it when actually profiling.
+    import pprofile
+
+    module = importlib.import_module(f'day_{day}')
+    solve_part = getattr(module, f'solve_part_{part}')
+    profiler = pprofile.Profile()
+    with profiler():
+        solve_part(input_file_path)
+    profiler.annotate(sys.stdout, filename=module.__file__)
+
+
+def run_benchmarks(
+    days: list[int],
+    scale: float = 1,
+    size: Optional[int] = None,
+    seed: int = 2021,
+    profile: bool = False,
+    stress: bool = False
+) -> list[BenchmarkResult]:
+    results: list[BenchmarkResult] = []
+    with tempfile.TemporaryDirectory() as directory:
+        for day in days:
+            input_generator = INPUT_GENERATORS[day]
+            base_size = input_generator.stress_size if stress else input_generator.default_size
+            day_size = size or max(1, round(base_size * scale))
+            input_file_path = generate_input_file(day, day_size, Path(directory), seed)
+            for part in input_generator.parts:
+                part_result = run_part(day, part, input_file_path, trace_memory=False)
+                if not part_result:
+                    continue
+                result = BenchmarkResult(day, part, day_size, part_result.wall_time, part_result.cpu_time)
+                print(f"Day {day} part {part} with size {day_size}:  {result.wall_time:.3f} s wall, {result.cpu_time:.3f} s CPU")
+                results.append(result)
+                if profile:
+                    profile_part(day, part, input_file_path)
+    return results
+
+
+def find_regressions(results: list[BenchmarkResult], baseline: dict[str, dict[str, float]], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for result in results:
+        baseline_result = baseline.get(result.key)
+        if baseline_result and result.cpu_time > baseline_result['cpu_time'] * (1 + tolerance):
+            regressions.append(
+                f"Day {result.day} part {result.part} with size {result.size} regressed:"
+                f"  {result.cpu_time:.3f} s CPU vs. {baseline_result['cpu_time']:.3f} s baseline"
+            )
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark Advent of Code 2021 solutions against scaled synthetic inputs.")
+    parser.add_argument('days', metavar='DAY', type=int, nargs='*', default=DAYS, help="days to benchmark (default: all)")
+    parser.add_argument('--stress', action='store_true', help="start from each day's stress size rather than its default size")
+    parser.add_argument('-s', '--scale', type=float, default=1, help="multiplier for each day's default or stress input size")
+    parser.add_argument('--size', type=int, help="exact input size to use instead of scaling the default")
+    parser.add_argument('--seed', type=int, default=2021, help="random seed for the input generators")
+    parser.add_argument('-o', '--output', type=Path, default=RESULTS_FILE_PATH, help="where to write the timings as JSON")
+    parser.add_argument('-b', '--baseline', type=Path, default=BASELINE_FILE_PATH, help="timings to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store these timings as the new baseline")
+    parser.add_argument('--check', action='store_true', help="fail if there's no baseline to check for regressions against")
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25, help="fraction a part's CPU time may exceed its baseline by")
+    parser.add_argument('--profile', action='store_true', help="also profile each part line by line with pprofile")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.days, args.scale, args.size, args.seed, args.profile, args.stress)
+    results_json = {result.key: result.to_json() for result in results}
+    args.output.write_text(json.dumps(results_json, indent=2) + '\n')
+
+    if args.save_baseline:
+        baseline_json = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline_json.update(results_json)
+        args.baseline.write_text(json.dumps(baseline_json, indent=2) + '\n')
+        print(f"Saved baseline to {args.baseline}.")
+    elif args.baseline.exists():
+        regressions = find_regressions(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(regression)
+        if regressions:
+            sys.exit(1)
+    else:
+        # The baseline is machine specific, so isn't committed, and a fresh checkout has nothing to compare against.
+        print(f"No baseline at {args.baseline}, so regressions weren't checked.  Save one with --save-baseline.")
+        if args.check:
+            sys.exit(1)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+import itertools
+from pathlib import Path
+from random import Random
+from typing import Callable, Optional
+
+from day_8 import DIGIT_SIGNAL_PATTERNS
+from day_19 import COORDINATE_ROTATIONS
+
+
+FILE_PATH = Path(__file__)
+
+PARTS = (1, 2)
+
+OPEN_CHARS  = '([{<'
+CLOSE_CHARS = ')]}>'
+
+POLYMER_ELEMENTS = 'BCFHKNOPSV'
+
+SCANNER_RANGE = 1000
+
+
+class InputGenerator:
+    def __init__(
+        self,
+        generate: Callable[[int, Random], str],
+        default_size: int,
+        stress_size: Optional[int] = None,
+        parts: tuple[int, ...] = PARTS
+    ) -> None:
+        self.generate = generate
+        # Default sizes are about the size of the real puzzle inputs, and stress sizes scale them up as far as each
+        # day's solution can take in seconds.
+        self.default_size = default_size
+        self.stress_size = stress_size or default_size
+        # Some parts only terminate on carefully constructed puzzle inputs, so aren't benchmarked with random ones.
+        self.parts = parts
+
+
+def generate_day_1_input(size: int, random: Random) -> str:
+    depth = random.randint(100, 200)
+    depths: list[int] = []
+    for _ in range(size):
+        depth = max(0, depth + random.randint(-10, 20))
+        depths.append(depth)
+    return '\n'.join(str(depth) for depth in depths)
+
+
+def generate_day_2_input(size: int, random: Random) -> str:
+    return '\n'.join(f"{random.choice(('forward', 'forward', 'down', 'up'))} {random.randint(1, 9)}" for _ in range(size))
+
+
+def generate_day_3_input(size: int, random: Random) -> str:
+    # The life support rating needs the diagnostic numbers to be unique.
+    bit_width = max(12, size.bit_length() + 1)
+    return '\n'.join(f"{number:0{bit_width}b}" for number in random.sample(range(2 ** bit_width), size))
+
+
+def generate_day_4_input(size: int, random: Random) -> str:
+    numbers_to_be_drawn = random.sample(range(100), 100)
+    boards = [random.sample(range(100), 25) for _ in range(size)]
+    return '\n\n'.join(
+        [','.join(str(number) for number in numbers_to_be_drawn)]
+        + [
+            '\n'.join(' '.join(f"{number:>2}" for number in board[row_start:row_start + 5]) for row_start in range(0, 25, 5))
+            for board in boards
+        ]
+    )
+
+
+def generate_day_5_input(size: int, random: Random) -> str:
+    vent_lines: list[str] = []
+    for _ in range(size):
+        x1, y1 = random.randint(0, 999), random.randint(0, 999)
+        length = random.randint(1, 500)
+        x_increment, y_increment = random.choice(((1, 0), (0, 1), (1, 1), (1, -1)))
+        x2 = min(max(x1 + (x_increment * length), 0), 999)
+        y2 = min(max(y1 + (y_increment * length), 0), 999)
+        if x_increment and y_increment:
+            # Diagonal lines must stay at exactly 45 degrees after clamping.
+            length = min(abs(x2 - x1), abs(y2 - y1))
+            x2, y2 = x1 + (x_increment * length), y1 + (y_increment * length)
+        vent_lines.append(f"{x1},{y1} -> {x2},{y2}")
+    return '\n'.join(vent_lines)
+
+
+def generate_day_6_input(size: int, random: Random) -> str:
+    return ','.join(str(random.randint(1, 5)) for _ in range(size))
+
+
+def generate_day_7_input(size: int, random: Random) -> str:
+    return ','.join(str(int(random.expovariate(1 / 500))) for _ in range(size))
+
+
+def generate_day_8_input(size: int, random: Random) -> str:
+    digit_patterns = list(DIGIT_SIGNAL_PATTERNS)
+    lines: list[str] = []
+    for _ in range(size):
+        signal_wiring = dict(zip('abcdefg', random.sample('abcdefg', 7)))
+        wired_patterns = [''.join(signal_wiring[signal] for signal in pattern) for pattern in digit_patterns]
+        unique_signal_patterns = random.sample(wired_patterns, 10)
+        display_patterns = [random.choice(wired_patterns) for _ in range(4)]
+        lines.append(f"{' '.join(unique_signal_patterns)} | {' '.join(display_patterns)}")
+    return '\n'.join(lines)
+
+
+def generate_day_9_input(size: int, random: Random) -> str:
+    # Enough 9s to keep basins from percolating across the whole heightmap.
+    return '\n'.join(
+        ''.join('9' if random.random() < 0.45 else str(random.randint(0, 8)) for _ in range(size))
+        for _ in range(size)
+    )
+
+
+def generate_day_10_input(size: int, random: Random) -> str:
+    lines: list[str] = []
+    for _ in range(size):
+        line = ''
+        stack: list[str] = []
+        for _ in range(random.randint(20, 110)):
+            if stack and random.random() < 0.45:
+                line += CLOSE_CHARS[OPEN_CHARS.index(stack.pop())]
+            else:
+                open_char = random.choice(OPEN_CHARS)
+                stack.append(open_char)
+                line += open_char
+        if stack and random.random() < 0.5:
+            expected_char = CLOSE_CHARS[OPEN_CHARS.index(stack[-1])]
+            line += random.choice([char for char in CLOSE_CHARS if char != expected_char])
+        elif not stack:
+            line += random.choice(OPEN_CHARS)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def generate_day_11_input(size: int, random: Random) -> str:
+    return '\n'.join(''.join(str(random.randint(0, 9)) for _ in range(size)) for _ in range(size))
+
+
+def generate_day_12_input(size: int, random: Random) -> str:
+    small_caves = ['start', 'end'] + [
+        ''.join(letters)
+        for letters in random.sample(list(itertools.product('abcdefghijklmnopqrstuvwxyz', repeat=2)), size)
+    ]
+    large_caves = [''.join(letters) for letters in random.sample(list(itertools.product('ABCDEFGHIJKLMNOPQRSTUVWXYZ', repeat=2)), max(1, size // 4))]
+    connections: set[tuple[str, str]] = set()
+    for small_cave in small_caves[2:]:
+        for other_cave in random.sample(small_caves[:2] + small_caves[2:], 2):
+            if other_cave != small_cave:
+                connections.add(tuple(sorted((small_cave, other_cave))))
+    # Large caves are never connected to each other, otherwise there would be infinitely many paths.
+    for large_cave in large_caves:
+        for small_cave in random.sample(small_caves, min(3, len(small_caves))):
+            connections.add((large_cave, small_cave))
+    return '\n'.join(f"{cave_1}-{cave_2}" for cave_1, cave_2 in sorted(connections))
+
+
+def generate_day_13_input(size: int, random: Random) -> str:
+    # Each fold is exactly down the middle, so the paper ends up 40x6 like the real puzzle.
+    folds: list[tuple[str, int]] = []
+    width, height = 40, 6
+    while len(folds) < 12:
+        folds.append(('x', width))
+        width = (width * 2) + 1
+        folds.append(('y', height))
+        height = (height * 2) + 1
+    dot_coordinates = {(random.randrange(width), random.randrange(height)) for _ in range(size)}
+    return '\n'.join(
+        [f"{dot_x},{dot_y}" for dot_x, dot_y in dot_coordinates]
+        + ['']
+        + [f"fold along {axis}={distance}" for axis, distance in reversed(folds)]
+    )
+
+
+def generate_day_14_input(size: int, random: Random) -> str:
+    polymer_template = ''.join(random.choice(POLYMER_ELEMENTS) for _ in range(size))
+    element_pair_insertion_rules = [
+        f"{element_1}{element_2} -> {random.choice(POLYMER_ELEMENTS)}"
+        for element_1, element_2 in itertools.product(POLYMER_ELEMENTS, repeat=2)
+    ]
+    return '\n'.join([polymer_template, ''] + element_pair_insertion_rules)
+
+
+def generate_day_15_input(size: int, random: Random) -> str:
+    return '\n'.join(''.join(str(random.randint(1, 9)) for _ in range(size)) for _ in range(size))
+
+
+def generate_bits_packet(packets_left: list[int], depth: int, random: Random) -> str:
+    version = random.randint(0, 7)
+    packets_left[0] -= 1
+    if packets_left[0] <= 0 or depth >= 20 or random.random() < 0.4:
+        value_bits = f"{random.randint(0, 2 ** 32):b}"
+        value_bits = value_bits.zfill(-(-len(value_bits) // 4) * 4)
+        value_groups = [value_bits[index:index + 4] for index in range(0, len(value_bits), 4)]
+        return f"{version:03b}100" + ''.join(
+            ('1' if index < len(value_groups) - 1 else '0') + value_group
+            for index, value_group in enumerate(value_groups)
+        )
+
+    type_id = random.choice((0, 1, 2, 3, 5, 6, 7))
+    sub_packet_count = 2 if type_id >= 5 else random.randint(1, 4)
+    sub_packets_bits = ''.join(generate_bits_packet(packets_left, depth + 1, random) for _ in range(sub_packet_count))
+    # The total length of the sub-packets only has 15 bits, so long ones must be counted instead.
+    if len(sub_packets_bits) < 2 ** 15 and random.random() < 0.5:
+        return f"{version:03b}{type_id:03b}0{len(sub_packets_bits):015b}{sub_packets_bits}"
+    else:
+        return f"{version:03b}{type_id:03b}1{sub_packet_count:011b}{sub_packets_bits}"
+
+
+def generate_day_16_input(size: int, random: Random) -> str:
+    # Wrap the transmission in a sum packet that always has room for more sub-packets.
+    packets_left = [size]
+    sub_packets_bits = ''
+    sub_packet_count = 0
+    while packets_left[0] > 0 and sub_packet_count < (2 ** 11) - 1:
+        sub_packets_bits += generate_bits_packet(packets_left, 1, random)
+        sub_packet_count += 1
+    bits = f"{random.randint(0, 7):03b}0001{sub_packet_count:011b}{sub_packets_bits}"
+    bits += '0' * (-len(bits) % 4)
+    return ''.join(f"{int(bits[index:index + 4], 2):X}" for index in range(0, len(bits), 4))
+
+
+def generate_day_17_input(size: int, random: Random) -> str:
+    x_start = size + random.randint(0, size // 10)
+    y_start = -size + random.randint(0, size // 10)
+    return f"target area: x={x_start}..{x_start + (size // 3)}, y={y_start}..{y_start + (size // 2)}"
+
+
+def generate_snailfish_number(depth: int, random: Random) -> str:
+    if depth > 4 or (depth > 1 and random.random() < 0.3):
+        return str(random.randint(0, 9))
+    return f"[{generate_snailfish_number(depth + 1, random)},{generate_snailfish_number(depth + 1, random)}]"
+
+
+def generate_day_18_input(size: int, random: Random) -> str:
+    return '\n'.join(generate_snailfish_number(1, random) for _ in range(size))
+
+
+def generate_day_19_input(size: int, random: Random) -> str:
+    # Scanners are laid out as a random walk so each one overlaps the previous one by at least 12 beacons.
+    scanner_positions = [(0, 0, 0)]
+    beacon_positions: set[tuple[int, int, int]] = set()
+    for _ in range(size - 1):
+        previous_position = scanner_positions[-1]
+        axis = random.randrange(3)
+        position = tuple(
+            coordinate + (random.choice((-1, 1)) * random.randint(800, 1100) if index == axis else random.randint(-100, 100))
+            for index, coordinate in enumerate(previous_position)
+        )
+        scanner_positions.append(position)
+        overlap_ranges = [
+            (max(previous_coordinate, coordinate) - SCANNER_RANGE, min(previous_coordinate, coordinate) + SCANNER_RANGE)
+            for previous_coordinate, coordinate in zip(previous_position, position)
+        ]
+        overlap_beacons = [
+            beacon
+            for beacon in beacon_positions
+            if all(start <= beacon_coordinate <= end for beacon_coordinate, (start, end) in zip(beacon, overlap_ranges))
+        ]
+        for _ in range(12 - len(overlap_beacons)):
+            beacon_positions.add(tuple(random.randint(start, end) for start, end in overlap_ranges))
+    for position in scanner_positions:
+        for _ in range(14):
+            beacon_positions.add(tuple(coordinate + random.randint(-SCANNER_RANGE, SCANNER_RANGE) for coordinate in position))
+
+    scanner_reports: list[str] = []
+    for number, position in enumerate(scanner_positions):
+        coordinate_order, coordinate_polarity = random.choice(COORDINATE_ROTATIONS)
+        relative_beacons = [
+            tuple(beacon_coordinate - coordinate for beacon_coordinate, coordinate in zip(beacon, position))
+            for beacon in beacon_positions
+        ]
+        scanner_reports.append('\n'.join(
+            [f"--- scanner {number} ---"]
+            + [
+                ','.join(str(beacon[coordinate_order[index]] * coordinate_polarity[index]) for index in range(3))
+                for beacon in relative_beacons
+                if all(abs(beacon_coordinate) <= SCANNER_RANGE for beacon_coordinate in beacon)
+            ]
+        ))
+    return '\n\n'.join(scanner_reports)
+
+
+def generate_day_20_input(size: int, random: Random) -> str:
+    image_enhancement_algorithm = ''.join(random.choice('.#') for _ in range(512))
+    image_lines = [''.join(random.choice('.#') for _ in range(size)) for _ in range(size)]
+    return '\n'.join([image_enhancement_algorithm, ''] + image_lines)
+
+
+def generate_day_21_input(size: int, random: Random) -> str:
+    # The board and target scores are fixed by the puzzle, so only the starting positions vary.
+    return '\n'.join(f"Player {player_number} starting position: {random.randint(1, 10)}" for player_number in (1, 2))
+
+
+def generate_day_22_input(size: int, random: Random) -> str:
+    lines: list[str] = []
+    for step_number in range(size):
+        coordinate_limit, max_length = (50, 50) if step_number < 20 else (100000, 40000)
+        ranges = []
+        for _ in range(3):
+            start = random.randint(-coordinate_limit, coordinate_limit - 1)
+            ranges.append((start, min(start + random.randint(1, max_length), coordinate_limit)))
+        on_off = 'on' if step_number < 10 or random.random() < 0.5 else 'off'
+        lines.append(f"{on_off} x={ranges[0][0]}..{ranges[0][1]},y={ranges[1][0]}..{ranges[1][1]},z={ranges[2][0]}..{ranges[2][1]}")
+    return '\n'.join(lines)
+
+
+def generate_day_23_input(size: int, random: Random) -> str:
+    # The burrow is fixed by the puzzle, so only the starting arrangement of amphipods varies.
+    amphipods = random.sample('AABBCCDD', 8)
+    return '\n'.join((
+        '#############',
+        '#...........#',
+        f"###{'#'.join(amphipods[:4])}###",
+        f"  #{'#'.join(amphipods[4:])}#",
+        '  #########'
+    ))
+
+
+def generate_day_24_input(size: int, random: Random) -> str:
+    # MONAD pushes and pops base 26 digits of z; matching pushes and pops constrain pairs of model number digits,
+    # so there must be an even number of digits for any model number to be valid.
+    size -= size % 2
+    digit_parameters: list[tuple[int, int, int]] = []
+    pushed_digit_offsets: list[int] = []
+    for digit_number in range(size):
+        digits_left = size - digit_number
+        if pushed_digit_offsets and (len(pushed_digit_offsets) >= digits_left or random.random() < 0.5):
+            pushed_digit_offset = pushed_digit_offsets.pop()
+            digit_parameters.append((26, random.randint(-8, 8) - pushed_digit_offset, random.randint(0, 16)))
+        else:
+            y_offset = random.randint(0, 16)
+            pushed_digit_offsets.append(y_offset)
+            digit_parameters.append((1, random.randint(10, 16), y_offset))
+    return '\n'.join(
+        '\n'.join((
+            'inp w', 'mul x 0', 'add x z', 'mod x 26', f"div z {z_divisor}", f"add x {x_offset}", 'eql x w', 'eql x 0',
+            'mul y 0', 'add y 25', 'mul y x', 'add y 1', 'mul z y', 'mul y 0', 'add y w', f"add y {y_offset}", 'mul y x', 'add z y'
+        ))
+        for z_divisor, x_offset, y_offset in digit_parameters
+    )
+
+
+def generate_day_25_input(size: int, random: Random) -> str:
+    return '\n'.join(''.join(random.choice('>>>vvv....') for _ in range(size)) for _ in range(size))
+
+
+INPUT_GENERATORS: dict[int, InputGenerator] = {
+    1: InputGenerator(generate_day_1_input, 2000, 1000000),
+    2: InputGenerator(generate_day_2_input, 1000, 1000000),
+    3: InputGenerator(generate_day_3_input, 1000, 100000),
+    4: InputGenerator(generate_day_4_input, 100, 2000),
+    5: InputGenerator(generate_day_5_input, 500, 20000),
+    6: InputGenerator(generate_day_6_input, 300, 1000000),
+    7: InputGenerator(generate_day_7_input, 1000, 100000),
+    8: InputGenerator(generate_day_8_input, 200, 20000),
+    9: InputGenerator(generate_day_9_input, 100, 1000),
+    10: InputGenerator(generate_day_10_input, 100, 20000),
+    11: InputGenerator(generate_day_11_input, 10, 100, parts=(1,)),
+    12: InputGenerator(generate_day_12_input, 10, 20),
+    13: InputGenerator(generate_day_13_input, 1000, 100000),
+    14: InputGenerator(generate_day_14_input, 20, 1000),
+    15: InputGenerator(generate_day_15_input, 100, 300),
+    16: InputGenerator(generate_day_16_input, 300, 10000),
+    17: InputGenerator(generate_day_17_input, 150, 10000),
+    18: InputGenerator(generate_day_18_input, 100, 400),
+    19: InputGenerator(generate_day_19_input, 30, 60),
+    20: InputGenerator(generate_day_20_input, 100, 150),
+    21: InputGenerator(generate_day_21_input, 1),
+    22: InputGenerator(generate_day_22_input, 420, 1000),
+    23: InputGenerator(generate_day_23_input, 1),
+    24: InputGenerator(generate_day_24_input, 14),
+    25: InputGenerator(generate_day_25_input, 140, 200),
+}
@@ -1,36 +1,65 @@
 #!/usr/bin/env python
 
+from array import array
+from collections import deque
+import operator
 from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from puzzle_input import iter_ints, read_ints
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
 
+def check_window_size(window_size: int) -> None:
+    if window_size < 1:
+        raise ValueError(f"The window size must be at least 1:  {window_size}")
 
-def count_depth_increases(depths: list[int]) -> int:
-    depth_increases_count = 0
-    previous_depth = None
 
+def iter_window_depth_increases(depths: Iterable[int], window_size: int = 1) -> Iterator[bool]:
+    # Adjacent windows share all but their first and last depths, so comparing their sums only needs
+    # the depth that just left the window, which a ring buffer of the last `window_size` depths provides.
+    check_window_size(window_size)
+    window: deque[int] = deque(maxlen=window_size)
     for depth in depths:
-        if previous_depth is not None and depth > previous_depth:
-            depth_increases_count += 1
-        previous_depth = depth
+        if len(window) == window_size:
+            yield depth > window[0]
+        window.append(depth)
 
-    return depth_increases_count
 
+def count_window_depth_increases(depths: Iterable[int], window_size: int = 1) -> int:
+    return sum(iter_window_depth_increases(depths, window_size))
 
-def count_sliding_window_depth_increases(depths: list[int]) -> int:
-    depth_increases_count = 0
 
-    for index in range(3, len(depths)):
-        if sum(depths[index-2:index+1]) > sum(depths[index-3:index]):
-            depth_increases_count += 1
+def count_window_depth_increases_in_batch(depths: Sequence[int], window_size: int = 1) -> int:
+    check_window_size(window_size)
+    if isinstance(depths, array):
+        depths = memoryview(depths)
+    return sum(map(operator.gt, depths[window_size:], depths))
 
-    return depth_increases_count
 
+def count_depth_increases(depths: Iterable[int]) -> int:
+    return count_window_depth_increases(depths, 1)
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        depths = [int(line) for line in file]
 
-    print(f"Depth increases:  {count_depth_increases(depths)}")
-    print(f"Sliding window depth increases:  {count_sliding_window_depth_increases(depths)}")
+def count_sliding_window_depth_increases(depths: Iterable[int]) -> int:
+    return count_window_depth_increases(depths, 3)
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> array:
+    return read_ints(input_file_path)
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return count_depth_increases(iter_ints(input_file_path))
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return count_sliding_window_depth_increases(iter_ints(input_file_path))
+
+
+if __name__ == '__main__':
+    print(f"Depth increases:  {solve_part_1()}")
+    print(f"Sliding window depth increases:  {solve_part_2()}")
@@ -1,9 +1,14 @@
 #!/usr/bin/env python
 
 from pathlib import Path
+import random
+from typing import Iterable, Iterator, Optional, Union
+
+from puzzle_input import iter_byte_lines
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 OPEN_CHARS  = '([{<'
 CLOSE_CHARS = ')]}>'
@@ -22,63 +27,104 @@ AUTOCOMPLETE_CHAR_POINTS = {
     '>': 4
 }
 
+# Translates open chars to their closing chars' autocomplete points, and close chars to those points plus 4, so
+# matching chars are 4 apart.  Every other byte becomes 0.
+CHUNK_CODES_BY_CHAR = {
+    **{open_char: AUTOCOMPLETE_CHAR_POINTS[close_char] for open_char, close_char in zip(OPEN_CHARS, CLOSE_CHARS)},
+    **{close_char: AUTOCOMPLETE_CHAR_POINTS[close_char] + 4 for close_char in CLOSE_CHARS}
+}
+CHUNK_CODES = bytes(CHUNK_CODES_BY_CHAR.get(chr(byte), 0) for byte in range(256))
+CLOSE_CHARS_BY_CODE = {AUTOCOMPLETE_CHAR_POINTS[close_char] + 4: close_char for close_char in CLOSE_CHARS}
+
 
-class IllegalCharError(Exception):
-    def __init__(self, input: str, expected_char: str, illegal_char: str) -> None:
-        super().__init__(f"{input} - Expected {expected_char}, but found {illegal_char} instead.")
+class LineValidation:
+    def __init__(self, illegal_char: Optional[str] = None, autocomplete_score: int = 0) -> None:
         self.illegal_char = illegal_char
+        self.autocomplete_score = autocomplete_score
+
+    @property
+    def is_corrupted(self) -> bool:
+        return self.illegal_char is not None
+
+    @property
+    def is_incomplete(self) -> bool:
+        return self.autocomplete_score > 0
+
+
+def validate_line(line: Union[str, bytes]) -> LineValidation:
+    if isinstance(line, str):
+        line = line.encode()
+    stack = bytearray()
+    for index, code in enumerate(line.translate(CHUNK_CODES)):
+        if not code:
+            raise Exception(f"Unexpected character at position {index + 1}:  {chr(line[index])}")
+        if code <= 4:
+            stack.append(code)
+        elif stack and stack[-1] == code - 4:
+            stack.pop()
+        else:
+            return LineValidation(illegal_char=CLOSE_CHARS_BY_CODE[code])
+
+    autocomplete_score = 0
+    for code in reversed(stack):
+        autocomplete_score = (autocomplete_score * 5) + code
+    return LineValidation(autocomplete_score=autocomplete_score)
+
+
+def select(values: list[int], rank: int) -> int:
+    # Quickselect, for the value that would be at the given index if the values were sorted.
+    while True:
+        pivot = random.choice(values)
+        lower_values = [value for value in values if value < pivot]
+        if rank < len(lower_values):
+            values = lower_values
+            continue
+        rank -= len(lower_values)
+        pivot_count = values.count(pivot)
+        if rank < pivot_count:
+            return pivot
+        rank -= pivot_count
+        values = [value for value in values if value > pivot]
+
+
+def score_lines(lines: Iterable[Union[str, bytes]]) -> tuple[int, list[int]]:
+    # Returns the syntax error score, and the autocomplete scores of the incomplete lines.
+    syntax_error_score = 0
+    autocomplete_scores: list[int] = []
+    for line in lines:
+        line_validation = validate_line(line)
+        if line_validation.is_corrupted:
+            syntax_error_score += ILLEGAL_CHAR_POINTS[line_validation.illegal_char]
+        elif line_validation.is_incomplete:
+            autocomplete_scores.append(line_validation.autocomplete_score)
+    return syntax_error_score, autocomplete_scores
 
 
-class IncompleteLineError(Exception):
-    def __init__(self, input: str, completion: str) -> None:
-        super().__init__(f"{input} - Complete by adding {completion}.")
-        self.completion = completion
+def find_middle_autocomplete_score(autocomplete_scores: list[int]) -> int:
+    if not autocomplete_scores:
+        raise Exception("There are no incomplete lines to autocomplete.")
+    return select(autocomplete_scores, len(autocomplete_scores) // 2)
 
 
-def validate_line(line: str) -> None:
-    stack: list[str] = []
-    for index, char in enumerate(line):
-        if char in OPEN_CHARS:
-            stack.append(char)
-        elif char in CLOSE_CHARS:
-            expected_char = CLOSE_CHARS[OPEN_CHARS.index(stack[-1])]
-            if char == expected_char:
-                stack.pop()
-            else:
-                raise IllegalCharError(line[:index + 1], expected_char, char)
-        else:
-            raise Exception(f"Unexpected character at position {index + 1}:  {char}")
-    if stack:
-        completion = ''.join(CLOSE_CHARS[OPEN_CHARS.index(open_char)] for open_char in reversed(stack))
-        raise IncompleteLineError(line, completion)
+def score_navigation_subsystem(lines: Iterable[Union[str, bytes]]) -> tuple[int, int]:
+    syntax_error_score, autocomplete_scores = score_lines(lines)
+    return syntax_error_score, find_middle_autocomplete_score(autocomplete_scores)
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        lines = [line.rstrip() for line in file]
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> Iterator[bytes]:
+    return iter_byte_lines(input_file_path)
 
-    illegal_chars: list[str] = []
-    line_completions: list[str] = []
 
-    for line in lines:
-        try:
-            validate_line(line)
-        except IllegalCharError as error:
-            print(error)
-            illegal_chars.append(error.illegal_char)
-        except IncompleteLineError as error:
-            print(error)
-            line_completions.append(error.completion)
-
-    syntax_error_score = sum(ILLEGAL_CHAR_POINTS[char] for char in illegal_chars)
-    print(f"Syntax error score:  {syntax_error_score}")
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    syntax_error_score, _ = score_lines(parse_input(input_file_path))
+    return syntax_error_score
 
-    autocomplete_scores: list[int] = []
-    for completion in line_completions:
-        autocomplete_score = 0
-        for char in completion:
-            autocomplete_score = (autocomplete_score * 5) + AUTOCOMPLETE_CHAR_POINTS[char]
-        autocomplete_scores.append(autocomplete_score)
-    autocomplete_scores.sort()
-    middle_autocomplete_score = autocomplete_scores[len(autocomplete_scores) // 2]
-    print(f"Middle autocomplete score:  {middle_autocomplete_score}")
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    _, autocomplete_scores = score_lines(parse_input(input_file_path))
+    return find_middle_autocomplete_score(autocomplete_scores)
+
+
+if __name__ == '__main__':
+    print(f"Syntax error score:  {solve_part_1()}")
+    print(f"Middle autocomplete score:  {solve_part_2()}")
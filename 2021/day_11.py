@@ -1,72 +1,166 @@
 #!/usr/bin/env python
 
+import itertools
 from pathlib import Path
+from typing import Optional
 
+import events
+from puzzle_input import read_digit_grid
 
-FILE_PATH = Path(__file__)
-
-
-class Octopus:
-    def __init__(self, x: int, y: int, energy_level: int) -> None:
-        self.x = x
-        self.y = y
-        self.energy_level = energy_level
-        self.has_just_flashed = False
-
-    def __repr__(self) -> str:
-        return str(self.energy_level)
-
-
-def increase_octopus_energy_level(octopus: Octopus, octopus_grid: list[list[Octopus]]) -> None:
-    if octopus.has_just_flashed:
-        return
 
-    octopus.energy_level += 1
+FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+FLASH_ENERGY_LEVEL = 10
+
+ADJASCENT_DIFFS = (
+    (-1, -1), (0, -1), (1, -1),
+    (-1,  0),          (1,  0),
+    (-1,  1), (0,  1), (1,  1)
+)
+
+# Raises every energy level by 1, and marks which octopi are about to flash.
+INCREASE_ENERGY_LEVELS = bytes(min(energy_level + 1, 255) for energy_level in range(256))
+IS_FLASHING = bytes(energy_level >= FLASH_ENERGY_LEVEL for energy_level in range(256))
+
+
+class OctopusGrid:
+    def __init__(self, energy_levels: bytearray, width: int) -> None:
+        self.energy_levels = energy_levels
+        self.width = width
+        self.height = len(energy_levels) // width if width else 0
+        self.step_count = 0
+        # Octopi are indexes into the flat energy levels, and so are their neighbours.
+        self.adjascent_octopi = [
+            tuple(
+                ((y + diff_y) * width) + x + diff_x
+                for diff_x, diff_y in ADJASCENT_DIFFS
+                if 0 <= x + diff_x < width and 0 <= y + diff_y < self.height
+            )
+            for y in range(self.height)
+            for x in range(width)
+        ]
 
-    if octopus.energy_level > 9:
-        octopus.energy_level = 0
-        octopus.has_just_flashed = True
+    def __len__(self) -> int:
+        return len(self.energy_levels)
 
-        adjascent_diffs = (
-            (-1, -1), (0, -1), (1, -1),
-            (-1,  0),          (1,  0),
-            (-1,  1), (0,  1), (1,  1)
+    def __str__(self) -> str:
+        return '\n'.join(
+            ''.join(map(str, self.energy_levels[y * self.width:(y + 1) * self.width]))
+            for y in range(self.height)
         )
-        for diff_x, diff_y in adjascent_diffs:
-            adjascent_x = octopus.x + diff_x
-            adjascent_y = octopus.y + diff_y
-            if 0 <= adjascent_x < len(octopus_grid[octopus.y]) and 0 <= adjascent_y < len(octopus_grid):
-                increase_octopus_energy_level(octopus_grid[adjascent_y][adjascent_x], octopus_grid)
 
+    def advance(self, energy_levels: bytearray) -> bytearray:
+        energy_levels = energy_levels.translate(INCREASE_ENERGY_LEVELS)
+        flashing_octopi = list(itertools.compress(range(len(energy_levels)), energy_levels.translate(IS_FLASHING)))
+        # Flashed octopi go back to 0 straight away, and as every other octopus has at least 1 energy by now, 0 also
+        # means an octopus can't flash again this step.
+        for octopus in flashing_octopi:
+            energy_levels[octopus] = 0
+        adjascent_octopi = self.adjascent_octopi
+        while flashing_octopi:
+            for adjascent_octopus in adjascent_octopi[flashing_octopi.pop()]:
+                energy_level = energy_levels[adjascent_octopus]
+                if energy_level:
+                    if energy_level + 1 >= FLASH_ENERGY_LEVEL:
+                        energy_levels[adjascent_octopus] = 0
+                        flashing_octopi.append(adjascent_octopus)
+                    else:
+                        energy_levels[adjascent_octopus] = energy_level + 1
+        return energy_levels
+
+    def step(self) -> int:
+        self.energy_levels = self.advance(self.energy_levels)
+        self.step_count += 1
+
+        flash_count = self.energy_levels.count(0)
+        events.emit(events.DETAIL, "Step {step} flashes:  {flash_count}", step=self.step_count, flash_count=flash_count)
+        return flash_count
+
+    def simulate(self, steps: int) -> int:
+        # Once the grid repeats a state it cycles forever, so the remaining steps are counted from the cycle.
+        state_history = StateHistory(self)
+        flash_counts: list[int] = []
+        for simulated_steps in range(1, steps + 1):
+            flash_counts.append(self.step())
+            cycle_start_step = state_history.find_earlier_step(bytes(self.energy_levels), self.step_count)
+            if cycle_start_step is not None:
+                cycle_flash_counts = flash_counts[cycle_start_step - state_history.first_step:]
+                cycle_count, remaining_steps = divmod(steps - simulated_steps, len(cycle_flash_counts))
+                events.emit(
+                    events.DETAIL,
+                    "Cycle of {cycle_length} steps from step {cycle_start_step}",
+                    cycle_length=len(cycle_flash_counts),
+                    cycle_start_step=cycle_start_step
+                )
+                self.energy_levels = state_history.state_at(cycle_start_step + remaining_steps)
+                self.step_count += steps - simulated_steps
+                return sum(flash_counts) + (cycle_count * sum(cycle_flash_counts)) + sum(cycle_flash_counts[:remaining_steps])
+        return sum(flash_counts)
+
+    def find_cycle(self, max_steps: Optional[int] = None) -> Optional[tuple[int, int]]:
+        # Returns the first step of the cycle the grid ends up in, and its length.
+        state_history = StateHistory(self)
+        for _ in range(max_steps) if max_steps is not None else itertools.count():
+            self.step()
+            earlier_step = state_history.find_earlier_step(bytes(self.energy_levels), self.step_count)
+            if earlier_step is not None:
+                return earlier_step + 1, self.step_count - earlier_step
+        return None
+
+    def find_synchronized_step(self, max_steps: Optional[int] = None) -> Optional[int]:
+        # Returns None if the grid starts cycling without all the octopi ever flashing together.
+        state_history = StateHistory(self)
+        for _ in range(max_steps) if max_steps is not None else itertools.count():
+            if self.step() == len(self):
+                return self.step_count
+            if state_history.find_earlier_step(bytes(self.energy_levels), self.step_count) is not None:
+                return None
+        return None
+
+
+class StateHistory:
+    # Remembers the steps grid states were seen at by their hashes alone, so it grows by a few ints per step rather
+    # than a whole grid.  Only the first state is kept, and states with the same hash are compared by replaying the
+    # steps from it, which only happens once the grid has cycled, barring hash collisions.
+    def __init__(self, octopus_grid: OctopusGrid) -> None:
+        self.octopus_grid = octopus_grid
+        self.first_state = bytes(octopus_grid.energy_levels)
+        self.first_step = octopus_grid.step_count
+        self.steps_by_state_hash: dict[int, list[int]] = {hash(self.first_state): [self.first_step]}
+
+    def state_at(self, step: int) -> bytearray:
+        energy_levels = bytearray(self.first_state)
+        for _ in range(step - self.first_step):
+            energy_levels = self.octopus_grid.advance(energy_levels)
+        return energy_levels
+
+    def find_earlier_step(self, state: bytes, step: int) -> Optional[int]:
+        # Returns the step this state was seen at before, or remembers it and returns None.
+        earlier_steps = self.steps_by_state_hash.setdefault(hash(state), [])
+        for earlier_step in earlier_steps:
+            if self.state_at(earlier_step) == state:
+                return earlier_step
+        earlier_steps.append(step)
+        return None
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> OctopusGrid:
+    energy_level_grid = read_digit_grid(input_file_path)
+    return OctopusGrid(energy_level_grid.cells, energy_level_grid.width)
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return parse_input(input_file_path).simulate(100)
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    synchronized_step = parse_input(input_file_path).find_synchronized_step()
+    if synchronized_step is None:
+        raise Exception("The octopi never all flash during the same step.")
+    return synchronized_step
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        octopus_grid = [
-            [Octopus(x, y, int(energy_level_str)) for x, energy_level_str in enumerate(line.rstrip())]
-            for y, line in enumerate(file)
-        ]
 
-    octopi = [octopus for row in octopus_grid for octopus in row]
-    step = 0
-    first_all_flash_step = None
-    total_flash_count = 0
-    while step <= 100 or not first_all_flash_step:
-        step += 1
-        step_flash_count = 0
-        for octopus in octopi:
-            increase_octopus_energy_level(octopus, octopus_grid)
-        for octopus in octopi:
-            if octopus.has_just_flashed:
-                step_flash_count += 1
-                octopus.has_just_flashed = False
-        print(f"Step {step} flashes:  {step_flash_count}")
-        total_flash_count += step_flash_count
-
-        if step % 100 == 0:
-            print(f"Total flashes after {step} steps:  {total_flash_count}")
-
-        if step_flash_count == len(octopi) and not first_all_flash_step:
-            first_all_flash_step = step
-    
-    print(f"Total flashes after {step} steps:  {total_flash_count}")
-    print(f"First step during which all octopuses flash:  {first_all_flash_step}")
+if __name__ == '__main__':
+    print(f"Total flashes after 100 steps:  {solve_part_1()}")
+    print(f"First step during which all octopuses flash:  {solve_part_2()}")
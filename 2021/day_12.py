@@ -1,58 +1,108 @@
 #!/usr/bin/env python
 
+import functools
 from pathlib import Path
+from typing import Iterator
 
-
-FILE_PATH = Path(__file__)
-
-
-class Cave:
-    def __init__(self, name: str) -> None:
-        self.name = name
-        self.is_start = name == 'start'
-        self.is_end = name == 'end'
-        self.is_large = name == name.upper()
-        self.adjascent_caves: list[Cave] = []
-
-    def __hash__(self) -> int:
-        return hash(self.name)
-
-    def __repr__(self) -> str:
-        return self.name
+from puzzle_input import iter_lines
 
 
-def find_paths(start_path: list[Cave], allow_repeating_one_small_cave: bool = False) -> list[list[Cave]]:
-    paths: list[list[Cave]] = []
-    for adjascent_cave in start_path[-1].adjascent_caves:
-        extended_path = start_path + [adjascent_cave]
-        if adjascent_cave.is_end:
-            paths.append(extended_path)
-        elif adjascent_cave.is_large or adjascent_cave not in start_path:
-            paths.extend(find_paths(extended_path, allow_repeating_one_small_cave))
-        elif allow_repeating_one_small_cave and not adjascent_cave.is_start:
-            paths.extend(find_paths(extended_path, allow_repeating_one_small_cave=False))
-    return paths
+FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+
+class CaveSystem:
+    def __init__(self) -> None:
+        # Caves are interned to ids, which index these lists.
+        self.cave_names: list[str] = []
+        self.cave_ids: dict[str, int] = {}
+        self.adjascent_caves: list[list[int]] = []
+        # Small caves each get a bit, so the small caves a path has visited are a single int.  Large caves get 0.
+        self.small_cave_bits: list[int] = []
+        self.small_cave_count = 0
+
+    def add_cave(self, name: str) -> int:
+        cave = self.cave_ids.get(name)
+        if cave is None:
+            cave = len(self.cave_names)
+            self.cave_ids[name] = cave
+            self.cave_names.append(name)
+            self.adjascent_caves.append([])
+            if name == name.upper():
+                self.small_cave_bits.append(0)
+            else:
+                self.small_cave_bits.append(1 << self.small_cave_count)
+                self.small_cave_count += 1
+        return cave
+
+    def connect(self, cave_1_name: str, cave_2_name: str) -> None:
+        cave_1 = self.add_cave(cave_1_name)
+        cave_2 = self.add_cave(cave_2_name)
+        self.adjascent_caves[cave_1].append(cave_2)
+        self.adjascent_caves[cave_2].append(cave_1)
+
+    def find_start_and_end_caves(self) -> tuple[int, int]:
+        if 'start' not in self.cave_ids:
+            raise Exception("There is no start cave.")
+        # Without an end cave there are simply no paths.
+        return self.cave_ids['start'], self.cave_ids.get('end', -1)
+
+    def count_paths(self, allow_repeating_one_small_cave: bool = False) -> int:
+        start_cave, end_cave = self.find_start_and_end_caves()
+        adjascent_caves = self.adjascent_caves
+        small_cave_bits = self.small_cave_bits
+
+        # Paths onwards from a cave only depend on which small caves they can't enter, and whether they can still
+        # repeat one, so each of those combinations is only counted once.
+        @functools.lru_cache(maxsize=None)
+        def count_paths_from(cave: int, visited_small_caves: int, can_repeat_small_cave: bool) -> int:
+            path_count = 0
+            for adjascent_cave in adjascent_caves[cave]:
+                if adjascent_cave == end_cave:
+                    path_count += 1
+                elif not (visited_small_caves & small_cave_bits[adjascent_cave]):
+                    path_count += count_paths_from(adjascent_cave, visited_small_caves | small_cave_bits[adjascent_cave], can_repeat_small_cave)
+                elif can_repeat_small_cave and adjascent_cave != start_cave:
+                    path_count += count_paths_from(adjascent_cave, visited_small_caves, False)
+            return path_count
+
+        return count_paths_from(start_cave, small_cave_bits[start_cave], allow_repeating_one_small_cave)
+
+    def find_paths(self, allow_repeating_one_small_cave: bool = False) -> Iterator[list[str]]:
+        start_cave, end_cave = self.find_start_and_end_caves()
+        path = [start_cave]
+
+        def find_paths_from(cave: int, visited_small_caves: int, can_repeat_small_cave: bool) -> Iterator[list[str]]:
+            for adjascent_cave in self.adjascent_caves[cave]:
+                path.append(adjascent_cave)
+                if adjascent_cave == end_cave:
+                    yield [self.cave_names[path_cave] for path_cave in path]
+                elif not (visited_small_caves & self.small_cave_bits[adjascent_cave]):
+                    yield from find_paths_from(adjascent_cave, visited_small_caves | self.small_cave_bits[adjascent_cave], can_repeat_small_cave)
+                elif can_repeat_small_cave and adjascent_cave != start_cave:
+                    yield from find_paths_from(adjascent_cave, visited_small_caves, False)
+                path.pop()
+
+        return find_paths_from(start_cave, self.small_cave_bits[start_cave], allow_repeating_one_small_cave)
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> CaveSystem:
+    cave_system = CaveSystem()
+    for line in iter_lines(input_file_path):
+        if line:
+            cave_1_name, cave_2_name = line.split('-')
+            cave_system.connect(cave_1_name, cave_2_name)
+    return cave_system
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return parse_input(input_file_path).count_paths(allow_repeating_one_small_cave=False)
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return parse_input(input_file_path).count_paths(allow_repeating_one_small_cave=True)
 
 
 if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        cave_connections = [line.rstrip().split('-') for line in file]
-
-    caves: dict[str, Cave] = {}
-    for cave_1_name, cave_2_name in cave_connections:
-        if cave_1_name not in caves:
-            caves[cave_1_name] = Cave(cave_1_name)
-        cave_1 = caves[cave_1_name]
-
-        if cave_2_name not in caves:
-            caves[cave_2_name] = Cave(cave_2_name)
-        cave_2 = caves[cave_2_name]
-
-        cave_1.adjascent_caves.append(cave_2)
-        cave_2.adjascent_caves.append(cave_1)
-
-    paths_not_repeating_small_caves = find_paths([caves['start']], allow_repeating_one_small_cave=False)
-    print(f"Found {len(paths_not_repeating_small_caves)} paths that don't repeat small caves.")
-
-    paths_repeating_one_small_cave = find_paths([caves['start']], allow_repeating_one_small_cave=True)
-    print(f"Found {len(paths_repeating_one_small_cave)} paths that can repeat one small cave twice.")
+    print(f"Found {solve_part_1()} paths that don't repeat small caves.")
+    print(f"Found {solve_part_2()} paths that can repeat one small cave twice.")
@@ -1,49 +1,70 @@
 #!/usr/bin/env python
 
 from pathlib import Path
+from typing import Iterable, Optional
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
 class Paper:
-    def __init__(self, dot_coordinates: list[tuple[int, int]]) -> None:
-        max_x = max(dot_coordinate[0] for dot_coordinate in dot_coordinates)
-        max_y = max(dot_coordinate[1] for dot_coordinate in dot_coordinates)
-        self.dots = [[False for _ in range(max_x + 1)] for _ in range(max_y + 1)]
-        for dot_x, dot_y in dot_coordinates:
-            self.dots[dot_y][dot_x] = True
+    def __init__(self, dot_coordinates: Iterable[tuple[int, int]]) -> None:
+        # Only the dots are stored, so the paper can be any size.
+        self.dots = set(dot_coordinates)
+        self.width = max((dot_x for dot_x, _ in self.dots), default=-1) + 1
+        self.height = max((dot_y for _, dot_y in self.dots), default=-1) + 1
 
     def count_dots(self) -> int:
-        return sum(1 for row in self.dots for has_dot in row if has_dot)
+        return len(self.dots)
 
     def fold(self, axis: str, distance: int) -> None:
-        if axis == 'x':
-            new_dots = [row[:distance] for row in self.dots]
-            for dot_y in range(0, len(self.dots)):
-                for dot_x in range(distance + 1, len(self.dots[dot_y])):
-                    if self.dots[dot_y][dot_x]:
-                        new_dots[dot_y][distance - (dot_x - distance)] = True
-        elif axis == 'y':
-            new_dots = self.dots[:distance]
-            for dot_y in range(distance + 1, len(self.dots)):
-                for dot_x in range(len(self.dots[dot_y])):
-                    if self.dots[dot_y][dot_x]:
-                        new_dots[distance - (dot_y - distance)][dot_x] = True
-        else:
-            raise Exception(f"Unkown axis:  {axis}")
-
-        self.dots = new_dots
+        self.fold_all([(axis, distance)])
+
+    def fold_all(self, folds: Iterable[tuple[str, int]]) -> None:
+        # Folds along one axis never move dots along the other, so each axis gets its own sequence of folds.  Every
+        # distinct coordinate is put through its whole sequence once, then each dot is moved with a lookup per axis.
+        fold_distances: dict[str, list[int]] = {'x': [], 'y': []}
+        for axis, distance in folds:
+            if axis not in fold_distances:
+                raise Exception(f"Unkown axis:  {axis}")
+            fold_distances[axis].append(distance)
+        if not fold_distances['x'] and not fold_distances['y']:
+            return
+
+        folded_xs = {dot_x: fold_coordinate(dot_x, fold_distances['x']) for dot_x in {dot_x for dot_x, _ in self.dots}}
+        folded_ys = {dot_y: fold_coordinate(dot_y, fold_distances['y']) for dot_y in {dot_y for _, dot_y in self.dots}}
+        self.dots = {
+            (folded_xs[dot_x], folded_ys[dot_y])
+            for dot_x, dot_y in self.dots
+            if folded_xs[dot_x] is not None and folded_ys[dot_y] is not None
+        }
+        self.width = min([self.width] + fold_distances['x'])
+        self.height = min([self.height] + fold_distances['y'])
 
     def __str__(self) -> str:
-        return '\n'.join(''.join('#' if has_dot else '.' for has_dot in row) for row in self.dots)
+        rows = [bytearray(b'.' * self.width) for _ in range(self.height)]
+        for dot_x, dot_y in self.dots:
+            if 0 <= dot_x < self.width and 0 <= dot_y < self.height:
+                rows[dot_y][dot_x] = ord('#')
+        return '\n'.join(row.decode() for row in rows)
 
 
-if __name__ == '__main__':
+def fold_coordinate(coordinate: int, fold_distances: Iterable[int]) -> Optional[int]:
+    # Dots on a fold line disappear.
+    for distance in fold_distances:
+        if coordinate == distance:
+            return None
+        if coordinate > distance:
+            coordinate = distance - (coordinate - distance)
+    return coordinate
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> tuple[list[tuple[int, int]], list[tuple[str, int]]]:
     dot_coordinates: list[tuple[int, int]] = []
     folds: list[tuple[str, int]] = []
 
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
+    with open(input_file_path) as file:
         for line in file:
             if ',' in line:
                 dot_coordinates.append(tuple(int(coordinate) for coordinate in line.rstrip().split(',')))
@@ -51,10 +72,23 @@ if __name__ == '__main__':
                 axis, distance_str = line[11:].rstrip().split('=')
                 folds.append((axis, int(distance_str)))
 
+    return dot_coordinates, folds
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    dot_coordinates, folds = parse_input(input_file_path)
     paper = Paper(dot_coordinates)
-    print(f"Dots count:  {paper.count_dots()}")
-    for axis, distance in folds:
-        print(f"Fold along {axis}={distance}.")
-        paper.fold(axis, distance)
-        print(f"Dots count:  {paper.count_dots()}")
-    print(paper)
+    paper.fold(*folds[0])
+    return paper.count_dots()
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> str:
+    dot_coordinates, folds = parse_input(input_file_path)
+    paper = Paper(dot_coordinates)
+    paper.fold_all(folds)
+    return str(paper)
+
+
+if __name__ == '__main__':
+    print(f"Dots count after first fold:  {solve_part_1()}")
+    print(solve_part_2())
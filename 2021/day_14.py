@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 
-from collections import defaultdict
 from pathlib import Path
 
+import events
+from matrices import Matrix, multiply_vector_by_matrix, raise_matrix
+
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
 class Polymer:
@@ -12,31 +15,72 @@ class Polymer:
         self.initial_elements = initial_elements
         self.first_element = initial_elements[0]
         self.last_element = initial_elements[-1]
-        self.element_pair_counts: dict[str, int] = defaultdict(int)
-        for index in range(0, len(initial_elements) - 1):
-            self.element_pair_counts[initial_elements[index:index + 2]] += 1
         self.element_pair_insertion_rules = element_pair_insertion_rules
 
-    def polymerize(self) -> None:
-        current_element_pair_counts = self.element_pair_counts.copy()
-        for element_pair in current_element_pair_counts:
-            if element_pair in self.element_pair_insertion_rules:
-                current_element_pair_count = current_element_pair_counts[element_pair]
-                inserted_element = self.element_pair_insertion_rules[element_pair]
-                self.element_pair_counts[element_pair[0] + inserted_element] += current_element_pair_count
-                self.element_pair_counts[inserted_element + element_pair[1]] += current_element_pair_count
-                self.element_pair_counts[element_pair] -= current_element_pair_count
+        # Elements and element pairs are interned to indexes, a pair's index being first * element count + second.
+        self.elements = sorted(set(initial_elements).union(*element_pair_insertion_rules, *element_pair_insertion_rules.values()))
+        element_indexes = {element: element_index for element_index, element in enumerate(self.elements)}
+        element_count = len(self.elements)
+        self.pair_first_elements = [pair_index // element_count for pair_index in range(element_count * element_count)]
+
+        self.element_pair_counts = [0] * (element_count * element_count)
+        for index in range(0, len(initial_elements) - 1):
+            self.element_pair_counts[(element_indexes[initial_elements[index]] * element_count) + element_indexes[initial_elements[index + 1]]] += 1
+
+        # A sparse transition matrix:  the pairs each pair turns into in a step.
+        self.pair_transitions = [(pair_index,) for pair_index in range(element_count * element_count)]
+        for element_pair, inserted_element in element_pair_insertion_rules.items():
+            first_element_index = element_indexes[element_pair[0]]
+            second_element_index = element_indexes[element_pair[1]]
+            inserted_element_index = element_indexes[inserted_element]
+            self.pair_transitions[(first_element_index * element_count) + second_element_index] = (
+                (first_element_index * element_count) + inserted_element_index,
+                (inserted_element_index * element_count) + second_element_index
+            )
+
+    def polymerize(self, steps: int = 1, by_matrix_power: bool = False) -> None:
+        # Raising the transition matrix to a power only takes log2(steps) matrix multiplications, but the powered
+        # matrix is dense and its counts are huge, so with real rules it's far slower than stepping.
+        if by_matrix_power:
+            self.element_pair_counts = multiply_vector_by_matrix(self.element_pair_counts, raise_matrix(self.build_transition_matrix(), steps))
+            return
+
+        for step in range(1, steps + 1):
+            next_element_pair_counts = [0] * len(self.element_pair_counts)
+            for pair_index, pair_count in enumerate(self.element_pair_counts):
+                if pair_count:
+                    for next_pair_index in self.pair_transitions[pair_index]:
+                        next_element_pair_counts[next_pair_index] += pair_count
+            self.element_pair_counts = next_element_pair_counts
+            if events.is_enabled(events.DETAIL):
+                events.emit(events.DETAIL, "Elements after step {step}:  {element_count}", step=step, element_count=sum(self.count_elements().values()))
+
+    def build_transition_matrix(self) -> Matrix:
+        pair_count = len(self.pair_transitions)
+        transition_matrix = [[0] * pair_count for _ in range(pair_count)]
+        for pair_index, next_pair_indexes in enumerate(self.pair_transitions):
+            for next_pair_index in next_pair_indexes:
+                transition_matrix[pair_index][next_pair_index] += 1
+        return transition_matrix
 
     def count_elements(self) -> dict[str, int]:
-        element_counts: dict[str, int] = defaultdict(int)
-        for element_pair in self.element_pair_counts:
-            element_counts[element_pair[0]] += self.element_pair_counts[element_pair]
-        element_counts[self.last_element] += 1
-        return element_counts
+        # Every element is the first of a pair, apart from the last element.
+        element_counts = [0] * len(self.elements)
+        for first_element_index, pair_count in zip(self.pair_first_elements, self.element_pair_counts):
+            element_counts[first_element_index] += pair_count
+        element_counts[self.elements.index(self.last_element)] += 1
+        return {element: element_count for element, element_count in zip(self.elements, element_counts) if element_count}
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
+def polymerize_and_diff_elements(polymer_template: str, element_pair_insertion_rules: dict[str, str], steps: int) -> int:
+    polymer = Polymer(polymer_template, element_pair_insertion_rules)
+    polymer.polymerize(steps)
+    element_counts = polymer.count_elements()
+    return max(element_counts.values()) - min(element_counts.values())
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> tuple[str, dict[str, str]]:
+    with open(input_file_path) as file:
         polymer_template = file.readline().rstrip()
         element_pair_insertion_rules: dict[str, str] = {}
         for line in file:
@@ -44,21 +88,17 @@ if __name__ == '__main__':
                 element_pair, _, inserted_element = line.rstrip().split()
                 element_pair_insertion_rules[element_pair] = inserted_element
 
-    print(f"Template:  {polymer_template}")
-    polymer = Polymer(polymer_template, element_pair_insertion_rules)
-    for step in range(1, 41):
-        polymer.polymerize()
-        element_counts = polymer.count_elements()
-        print(f"Elements after step {step}:  {sum(element_counts.values())}")
-
-        if step in (10, 40):
-            most_common_element = max(element_counts, key=lambda element: element_counts[element])
-            most_common_element_count = element_counts[most_common_element]
-            print(f"Most common element after step {step}:  {most_common_element} ({most_common_element_count})")
-
-            least_common_element = min(element_counts, key=lambda element: element_counts[element])
-            least_common_element_count = element_counts[least_common_element]
-            print(f"Least common element after step {step}:  {least_common_element} ({least_common_element_count})")
-
-            most_least_common_element_diff = most_common_element_count - least_common_element_count
-            print(f"Difference between most & least common elements after step {step}:  {most_least_common_element_diff}")
+    return polymer_template, element_pair_insertion_rules
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return polymerize_and_diff_elements(*parse_input(input_file_path), 10)
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return polymerize_and_diff_elements(*parse_input(input_file_path), 40)
+
+
+if __name__ == '__main__':
+    print(f"Difference between most & least common elements after step 10:  {solve_part_1()}")
+    print(f"Difference between most & least common elements after step 40:  {solve_part_2()}")
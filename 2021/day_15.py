@@ -1,137 +1,171 @@
 #!/usr/bin/env python
 
-from __future__ import annotations
-from collections import OrderedDict
+from array import array
+import heapq
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Sequence
+
+import events
+from puzzle_input import DigitGrid, read_digit_grid
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
-ADJASCENT_DIFFS = (
-              (0, -1),
-    (-1,  0),          (1,  0),
-              (0,  1)
-)
+MAX_RISK_LEVEL = 9
+# Path risk levels (plus the heuristic) only ever grow by up to the max risk level plus 1 per step, so that many
+# buckets, reused in a cycle, always have room for every path risk level still to be explored.
+BUCKET_COUNT = MAX_RISK_LEVEL + 2
+UNREACHED = 2 ** 31 - 1
 
 
-class Point:
-    def __init__(self, x: int, y: int, risk_level: int) -> None:
-        self.x = x
-        self.y = y
-        self.risk_level = risk_level
+class RiskMap:
+    def __init__(self, first_tile: DigitGrid, tiles: int = 1) -> None:
+        # Only the first tile is stored, the risk levels of the others are worked out when they're looked up.
+        self.first_tile = first_tile
+        self.tiles = tiles
+        self.width = first_tile.width * tiles
+        self.height = first_tile.height * tiles
 
-    def __str__(self) -> str:
-        return f"({self.x},{self.y})+{self.risk_level}"
-
-
-class PathPoint:
-    def __init__(self, point: Point, previous_path_point: Optional[PathPoint] = None) -> None:
-        self.point = point
-        self.previous_path_point = previous_path_point
-        self.path_risk_level = 0
-        if previous_path_point:
-            self.path_risk_level = previous_path_point.path_risk_level + point.risk_level
-
-    def __str__(self) -> str:
-        path_traceback = []
-        path_point = self
-        while path_point:
-            path_traceback.append(f"{path_point.point} = {path_point.path_risk_level}")
-            path_point = path_point.previous_path_point
-        
-        return '\n'.join(reversed(path_traceback))
-
-
-def get_adjascent_points(point: Point, points_grid: list[list[Point]]) -> list[Point]:
-    return [
-        points_grid[point.y + diff_y][point.x + diff_x]
-        for diff_x, diff_y in ADJASCENT_DIFFS
-        if 0 <= (point.x + diff_x) < len(points_grid[point.y]) and 0 <= (point.y + diff_y) < len(points_grid)
-    ]
-
-
-def find_least_risky_path(points_grid: list[list[Point]]) -> PathPoint:
-    start_point = points_grid[0][0]
-    end_point = points_grid[-1][-1]
-    print(f"Finding path from {start_point} to {end_point}.")
-
-    start_path_point = PathPoint(start_point)
-    least_risky_path_to_point: dict[Point, PathPoint] = {
-        start_point: start_path_point
-    }
-    paths_to_explore: OrderedDict[Point, PathPoint] = OrderedDict({
-        adjascent_point: PathPoint(adjascent_point, start_path_point)
-        for adjascent_point in get_adjascent_points(start_point, points_grid)
-    })
-    explored_path_count = 0
-    ignored_local_suboptimal_path_count = 0
-    ignored_global_suboptimal_path_count = 0
-
-    while paths_to_explore:
-        point, path_point = paths_to_explore.popitem()
-
-        if point in least_risky_path_to_point and path_point.path_risk_level >= least_risky_path_to_point[point].path_risk_level:
-            ignored_local_suboptimal_path_count += 1
-            continue
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    def __getitem__(self, point: int) -> int:
+        y, x = divmod(point, self.width)
+        tile_y, first_tile_y = divmod(y, self.first_tile.height)
+        tile_x, first_tile_x = divmod(x, self.first_tile.width)
+        first_tile_risk_level = self.first_tile.cells[(first_tile_y * self.first_tile.width) + first_tile_x]
+        return ((first_tile_risk_level + tile_x + tile_y - 1) % MAX_RISK_LEVEL) + 1
 
-        if end_point in least_risky_path_to_point:
-            path_best_ultimate_risk_level = path_point.path_risk_level + (end_point.x - point.x) + (end_point.y - point.y)
-            if path_best_ultimate_risk_level >= least_risky_path_to_point[end_point].path_risk_level:
-                ignored_global_suboptimal_path_count += 1
-                continue
+    def risk_levels(self) -> Sequence[int]:
+        return self.first_tile.cells if self.tiles == 1 else self
 
-        least_risky_path_to_point[point] = path_point
+    def coordinates(self, point: int) -> tuple[int, int]:
+        y, x = divmod(point, self.width)
+        return x, y
+
+
+class LeastRiskyPath:
+    def __init__(self, risk_map: RiskMap, risk_level: int, previous_points: array) -> None:
+        self.risk_map = risk_map
+        self.risk_level = risk_level
+        self.previous_points = previous_points
+
+    def points(self) -> list[tuple[int, int]]:
+        path_points = [len(self.risk_map) - 1]
+        while path_points[-1]:
+            path_points.append(self.previous_points[path_points[-1]])
+        return [self.risk_map.coordinates(point) for point in reversed(path_points)]
+
+
+def iter_adjascent_points(point: int, width: int, size: int) -> Iterator[int]:
+    if point >= width:
+        yield point - width
+    if point % width:
+        yield point - 1
+    if (point + 1) % width:
+        yield point + 1
+    if point + width < size:
+        yield point + width
+
+
+def find_least_risky_path(risk_map: RiskMap, use_heuristic: bool = False, use_bucket_queue: bool = True) -> LeastRiskyPath:
+    # Dijkstra, or A* when using the heuristic, which is the Manhattan distance to the end as no risk level is below 1.
+    # Points are indexes into flat arrays.
+    width = risk_map.width
+    height = risk_map.height
+    size = len(risk_map)
+    end_point = size - 1
+    risk_levels = risk_map.risk_levels()
+    events.emit(events.DETAIL, "Finding path across {width}x{height} risk levels.", width=width, height=height)
+
+    def estimate_remaining_risk_level(point: int) -> int:
+        if not use_heuristic:
+            return 0
+        y, x = divmod(point, width)
+        return (width - 1 - x) + (height - 1 - y)
+
+    path_risk_levels = array('i', [UNREACHED]) * size
+    previous_points = array('i', [-1]) * size
+    is_explored = bytearray(size)
+    path_risk_levels[0] = 0
+
+    # Points are queued by their path risk level plus heuristic, either in a heap or in a bucket per level.
+    if use_bucket_queue:
+        buckets: list[list[int]] = [[] for _ in range(BUCKET_COUNT)]
+        buckets[estimate_remaining_risk_level(0) % BUCKET_COUNT].append(0)
+        estimated_risk_level = estimate_remaining_risk_level(0)
+        queued_point_count = 1
+
+        def pop_point() -> int:
+            nonlocal estimated_risk_level, queued_point_count
+            while not buckets[estimated_risk_level % BUCKET_COUNT]:
+                estimated_risk_level += 1
+            queued_point_count -= 1
+            return buckets[estimated_risk_level % BUCKET_COUNT].pop()
+
+        def push_point(point: int, estimated_point_risk_level: int) -> None:
+            nonlocal queued_point_count
+            queued_point_count += 1
+            buckets[estimated_point_risk_level % BUCKET_COUNT].append(point)
+
+        def has_queued_points() -> bool:
+            return queued_point_count > 0
+    else:
+        heap = [(estimate_remaining_risk_level(0), 0)]
+
+        def pop_point() -> int:
+            return heapq.heappop(heap)[1]
+
+        def push_point(point: int, estimated_point_risk_level: int) -> None:
+            heapq.heappush(heap, (estimated_point_risk_level, point))
+
+        def has_queued_points() -> bool:
+            return bool(heap)
+
+    explored_point_count = 0
+    while has_queued_points():
+        point = pop_point()
+        # Points can be queued more than once, but only their least risky path is explored.
+        if is_explored[point]:
+            continue
+        is_explored[point] = True
         if point == end_point:
-            print(f"Found path to end with risk level {path_point.path_risk_level}.")
+            break
+
+        point_risk_level = path_risk_levels[point]
+        for adjascent_point in iter_adjascent_points(point, width, size):
+            if not is_explored[adjascent_point]:
+                adjascent_path_risk_level = point_risk_level + risk_levels[adjascent_point]
+                if adjascent_path_risk_level < path_risk_levels[adjascent_point]:
+                    path_risk_levels[adjascent_point] = adjascent_path_risk_level
+                    previous_points[adjascent_point] = point
+                    push_point(adjascent_point, adjascent_path_risk_level + estimate_remaining_risk_level(adjascent_point))
+
+        explored_point_count += 1
+        if explored_point_count % 1000000 == 0:
+            events.emit(events.PROGRESS, "Explored {explored_point_count} points.", explored_point_count=explored_point_count)
+
+    events.emit(events.PROGRESS, "Explored {explored_point_count} points.", explored_point_count=explored_point_count)
+    if not is_explored[end_point]:
+        raise Exception("There is no path to the end.")
+    return LeastRiskyPath(risk_map, path_risk_levels[end_point], previous_points)
 
-        for adjascent_point in get_adjascent_points(point, points_grid):
-            if adjascent_point != path_point.previous_path_point.point:
-                new_path_point = PathPoint(adjascent_point, path_point)
-                if adjascent_point in paths_to_explore and new_path_point.path_risk_level >= paths_to_explore[adjascent_point].path_risk_level:
-                    ignored_local_suboptimal_path_count += 1
-                    continue
-                paths_to_explore[adjascent_point] = new_path_point
-                if adjascent_point.x < point.x or adjascent_point.y < point.y:
-                    paths_to_explore.move_to_end(adjascent_point, last=False)
 
-        explored_path_count += 1
-        if explored_path_count % 100000 == 0:
-            print(f"Explored {explored_path_count} paths.")
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> DigitGrid:
+    return read_digit_grid(input_file_path)
 
-    print(f"Explored {explored_path_count} paths.")
-    print(f"Ignored {ignored_local_suboptimal_path_count} locally suboptimal paths.")
-    print(f"Ignored {ignored_global_suboptimal_path_count} globally suboptimal paths.")
 
-    return least_risky_path_to_point[end_point]
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return find_least_risky_path(RiskMap(parse_input(input_file_path))).risk_level
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return find_least_risky_path(RiskMap(parse_input(input_file_path), tiles=5)).risk_level
 
 
 if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        first_tile_points_grid = [
-            [Point(x, y, int(risk_level_str)) for x, risk_level_str in enumerate(line.rstrip())]
-            for y, line in enumerate(file)
-        ]
-
-    tile_height = len(first_tile_points_grid)
-    tile_width = len(first_tile_points_grid[0])
-    first_tile_least_risky_path = find_least_risky_path(first_tile_points_grid)
-    print(f"Least risky path for first {tile_width}x{tile_height} tile:\n{first_tile_least_risky_path}")
-
-    points_grid = [
-        [
-            Point(
-                x,
-                y,
-                (((first_tile_points_grid[y % tile_height][x % tile_width].risk_level + (x // tile_width) + (y // tile_height) - 1) % 9) + 1)
-            )
-            for x in range(5 * tile_width)
-        ]
-        for y in range(5 * tile_height)
-    ]
-    area_height = len(points_grid)
-    area_width = len(points_grid[0])
-    print(f"Full area is {area_width}x{area_height}.")
-
-    least_risky_path = find_least_risky_path(points_grid)
-    print(f"Least risky path for full {area_width}x{area_height} area:\n{least_risky_path}")
+    events.add_event_handler(events.print_event, events.PROGRESS)
+
+    print(f"Least risky path risk level for first tile:  {solve_part_1()}")
+    print(f"Least risky path risk level for full area:  {solve_part_2()}")
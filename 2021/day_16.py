@@ -1,39 +1,52 @@
 #!/usr/bin/env python
 
 from abc import ABC as AbstractBaseClass, abstractmethod
+import math
 from pathlib import Path
+from typing import Optional
 
+import events
 
-FILE_PATH = Path(__file__)
 
-HEXADECIMAL_BITS = {
-    '0': '0000',
-    '1': '0001',
-    '2': '0010',
-    '3': '0011',
-    '4': '0100',
-    '5': '0101',
-    '6': '0110',
-    '7': '0111',
-    '8': '1000',
-    '9': '1001',
-    'A': '1010',
-    'B': '1011',
-    'C': '1100',
-    'D': '1101',
-    'E': '1110',
-    'F': '1111'
+FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+LITERAL_VALUE_TYPE_ID = 4
+
+OPERATIONS = {
+    0: sum,
+    1: math.prod,
+    2: min,
+    3: max,
+    5: lambda values: 1 if values[0] > values[1] else 0,
+    6: lambda values: 1 if values[0] < values[1] else 0,
+    7: lambda values: 1 if values[0] == values[1] else 0
 }
 
 
-def int_from_bits(bits: str) -> int:
-    return sum((2 ** index if bit == '1' else 0) for index, bit in enumerate(reversed(bits)))
+class BitReader:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.bit_length = len(data) * 8
+        self.position = 0
+
+    def read(self, bit_count: int) -> int:
+        # Reads just the bytes the bits are in, so nothing is copied beyond what's read.
+        end_position = self.position + bit_count
+        if end_position > self.bit_length:
+            raise Exception("The transmission ends in the middle of a packet.")
+        first_byte_index = self.position >> 3
+        end_byte_index = (end_position + 7) >> 3
+        bits = int.from_bytes(self.data[first_byte_index:end_byte_index], 'big') >> ((end_byte_index << 3) - end_position)
+        self.position = end_position
+        return bits & ((1 << bit_count) - 1)
 
 
 class Packet(AbstractBaseClass):
-    def __init__(self, bits: str, version: int, type_id: int) -> None:
-        self.bits = bits
-        self.length = len(bits)
+    def __init__(self, start_position: int, length: int, version: int, type_id: int) -> None:
+        # Packets know where they are in the transmission, rather than keeping a copy of their bits.
+        self.start_position = start_position
+        self.length = length
         self.version = version
         self.type_id = type_id
 
@@ -44,8 +57,8 @@ class Packet(AbstractBaseClass):
 
 
 class LiteralValuePacket(Packet):
-    def __init__(self, bits: str, version: int, type_id: int, value: int) -> None:
-        super().__init__(bits, version, type_id)
+    def __init__(self, start_position: int, length: int, version: int, type_id: int, value: int) -> None:
+        super().__init__(start_position, length, version, type_id)
         self._value = value
 
     @property
@@ -54,98 +67,142 @@ class LiteralValuePacket(Packet):
 
 
 class OperatorPacket(Packet):
-    def __init__(self, bits: str, version: int, type_id: int, sub_packets: list[Packet]) -> None:
-        super().__init__(bits, version, type_id)
+    def __init__(self, start_position: int, length: int, version: int, type_id: int, sub_packets: list[Packet]) -> None:
+        super().__init__(start_position, length, version, type_id)
         self.sub_packets = sub_packets
+        if type_id not in OPERATIONS:
+            raise Exception(f"Unknown operator packet type:  {type_id}")
+        # Sub-packets are always built first, so working the value out now never needs to recurse.
+        self._value = OPERATIONS[type_id]([sub_packet.value for sub_packet in sub_packets])
 
     @property
     def value(self) -> int:
-        if self.type_id == 0:
-            return sum(sub_packet.value for sub_packet in self.sub_packets)
-        elif self.type_id == 1:
-            value = self.sub_packets[0].value
-            for sub_packet in self.sub_packets[1:]:
-                value *= sub_packet.value
-            return value
-        elif self.type_id == 2:
-            return min(sub_packet.value for sub_packet in self.sub_packets)
-        elif self.type_id == 3:
-            return max(sub_packet.value for sub_packet in self.sub_packets)
-        elif self.type_id == 5:
-            return 1 if self.sub_packets[0].value > self.sub_packets[1].value else 0
-        elif self.type_id == 6:
-            return 1 if self.sub_packets[0].value < self.sub_packets[1].value else 0
-        elif self.type_id == 7:
-            return 1 if self.sub_packets[0].value == self.sub_packets[1].value else 0
-
-
-def parse_packet(bits: str) -> Packet:
-    version = int_from_bits(bits[0:3])
-    type_id = int_from_bits(bits[3:6])
-    content_offset = 6
-    if type_id == 4:
-        packet = parse_literal_value_packet(bits, version, type_id, content_offset)
-        print(f"Parsed literal value packet (version {version}) with value {packet.value}.")
-    else:
-        packet = parse_operator_packet(bits, version, type_id, content_offset)
-        print(f"Parsed operator type {type_id} packet (version {version}) with {len(packet.sub_packets)} sub-packets and value {packet.value}.")
+        return self._value
+
+
+class PendingOperatorPacket:
+    def __init__(self, start_position: int, version: int, type_id: int, sub_packets_end_position: Optional[int], sub_packet_count: Optional[int]) -> None:
+        # Operator packets either give the total length of their sub-packets or how many there are.
+        self.start_position = start_position
+        self.version = version
+        self.type_id = type_id
+        self.sub_packets_end_position = sub_packets_end_position
+        self.sub_packet_count = sub_packet_count
+        self.sub_packets: list[Packet] = []
+
+    def has_all_sub_packets(self, position: int) -> bool:
+        if self.sub_packets_end_position is not None:
+            return position >= self.sub_packets_end_position
+        return len(self.sub_packets) >= self.sub_packet_count
+
+    def finish(self, end_position: int) -> OperatorPacket:
+        packet = OperatorPacket(self.start_position, end_position - self.start_position, self.version, self.type_id, self.sub_packets)
+        if events.is_enabled(events.DETAIL):
+            events.emit(
+                events.DETAIL,
+                "Parsed operator type {type_id} packet (version {version}) with {sub_packet_count} sub-packets and value {value}.",
+                type_id=packet.type_id,
+                version=packet.version,
+                sub_packet_count=len(packet.sub_packets),
+                value=packet.value
+            )
+        return packet
+
+
+def parse_packet_header(bit_reader: BitReader) -> tuple[int, int, int]:
+    start_position = bit_reader.position
+    version = bit_reader.read(3)
+    type_id = bit_reader.read(3)
+    return start_position, version, type_id
+
+
+def parse_literal_value_packet(bit_reader: BitReader, start_position: int, version: int, type_id: int) -> LiteralValuePacket:
+    value = 0
+    has_more_groups = True
+    while has_more_groups:
+        value_group = bit_reader.read(5)
+        value = (value << 4) | (value_group & 0b1111)
+        has_more_groups = value_group >> 4
+    packet = LiteralValuePacket(start_position, bit_reader.position - start_position, version, type_id, value)
+    events.emit(events.DETAIL, "Parsed literal value packet (version {version}) with value {value}.", version=version, value=value)
     return packet
 
 
-def parse_literal_value_packet(bits: str, version: int, type_id: int, content_offset: int) -> LiteralValuePacket:
-    current_value_offset = content_offset
-    value_bits = ''
+def parse_pending_operator_packet(bit_reader: BitReader, start_position: int, version: int, type_id: int) -> PendingOperatorPacket:
+    if bit_reader.read(1):
+        return PendingOperatorPacket(start_position, version, type_id, None, bit_reader.read(11))
+    sub_packets_bit_length = bit_reader.read(15)
+    return PendingOperatorPacket(start_position, version, type_id, bit_reader.position + sub_packets_bit_length, None)
+
+
+def parse_packet(bit_reader: BitReader) -> Packet:
+    start_position, version, type_id = parse_packet_header(bit_reader)
+    if type_id == LITERAL_VALUE_TYPE_ID:
+        return parse_literal_value_packet(bit_reader, start_position, version, type_id)
+
+    pending_packet = parse_pending_operator_packet(bit_reader, start_position, version, type_id)
+    while not pending_packet.has_all_sub_packets(bit_reader.position):
+        pending_packet.sub_packets.append(parse_packet(bit_reader))
+    return pending_packet.finish(bit_reader.position)
+
+
+def parse_packet_iteratively(bit_reader: BitReader) -> Packet:
+    # The same as parse_packet, but with an explicit stack of unfinished operator packets instead of recursion, so
+    # packets can be nested any number of levels deep.
+    pending_packets: list[PendingOperatorPacket] = []
     while True:
-        value_bits += bits[current_value_offset + 1:current_value_offset + 5]
-        if bits[current_value_offset] == '0':
-            break
+        start_position, version, type_id = parse_packet_header(bit_reader)
+        if type_id == LITERAL_VALUE_TYPE_ID:
+            packet: Optional[Packet] = parse_literal_value_packet(bit_reader, start_position, version, type_id)
+        else:
+            pending_packets.append(parse_pending_operator_packet(bit_reader, start_position, version, type_id))
+            packet = None
+
+        # Finished packets are added to the packet they're in, which may finish that one in turn.
+        while pending_packets:
+            if packet is not None:
+                pending_packets[-1].sub_packets.append(packet)
+            if not pending_packets[-1].has_all_sub_packets(bit_reader.position):
+                break
+            packet = pending_packets.pop().finish(bit_reader.position)
         else:
-            current_value_offset += 5
-    packet_end_offset = current_value_offset + 5
-    packet_bits = bits[:packet_end_offset]
-    value = int_from_bits(value_bits)
-    return LiteralValuePacket(packet_bits, version, type_id, value)
-
-
-def parse_operator_packet(bits: str, version: int, type_id: int, content_offset: int) -> OperatorPacket:
-    length_type = 'length' if bits[content_offset] == '0' else 'count'
-    if length_type == 'length':
-        total_sub_packets_bit_length = int_from_bits(bits[content_offset + 1:content_offset + 16])
-        current_sub_packets_offset = content_offset + 16
-    else:
-        total_sub_packets_count = int_from_bits(bits[content_offset + 1:content_offset + 12])
-        current_sub_packets_offset = content_offset + 12
-
-    sub_packets: list[Packet] = []
-    current_sub_packets_bit_length = 0
-
-    while (
-        (length_type == 'length' and current_sub_packets_bit_length < total_sub_packets_bit_length)
-        or (length_type == 'count' and len(sub_packets) < total_sub_packets_count)
-    ):
-        sub_packet = parse_packet(bits[current_sub_packets_offset:])
-        sub_packets.append(sub_packet)
-        current_sub_packets_bit_length += sub_packet.length
-        current_sub_packets_offset += sub_packet.length
-
-    packet_bits = bits[:current_sub_packets_offset]
-    return OperatorPacket(packet_bits, version, type_id, sub_packets)
+            return packet
 
 
 def sum_packet_versions(packet: Packet) -> int:
-    versions_sum = packet.version
-    if isinstance(packet, OperatorPacket):
-        versions_sum += sum(sum_packet_versions(sub_packet) for sub_packet in packet.sub_packets)
+    versions_sum = 0
+    packets_to_sum = [packet]
+    while packets_to_sum:
+        packet = packets_to_sum.pop()
+        versions_sum += packet.version
+        if isinstance(packet, OperatorPacket):
+            packets_to_sum.extend(packet.sub_packets)
     return versions_sum
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
+def parse_transmission(transmission_hexadecimal: str, iteratively: bool = True) -> Packet:
+    # Hexadecimal digits are half a byte each, so an odd number of them is padded with zero bits.
+    if len(transmission_hexadecimal) % 2:
+        transmission_hexadecimal += '0'
+    bit_reader = BitReader(bytes.fromhex(transmission_hexadecimal))
+    return parse_packet_iteratively(bit_reader) if iteratively else parse_packet(bit_reader)
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> Packet:
+    with open(input_file_path) as file:
         transmission_hexadecimal = file.readline().rstrip()
 
-    transmission_bits = ''.join(HEXADECIMAL_BITS[char] for char in transmission_hexadecimal)
-    packet = parse_packet(transmission_bits)
-    print(f"Packet value:  {packet.value}")
+    return parse_transmission(transmission_hexadecimal)
+
 
-    packet_versions_sum = sum_packet_versions(packet)
-    print(f"Packet versions sum:  {packet_versions_sum}")
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return sum_packet_versions(parse_input(input_file_path))
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return parse_input(input_file_path).value
+
+
+if __name__ == '__main__':
+    print(f"Packet versions sum:  {solve_part_1()}")
+    print(f"Packet value:  {solve_part_2()}")
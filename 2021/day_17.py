@@ -1,10 +1,19 @@
 #!/usr/bin/env python
 
+from bisect import bisect_left, bisect_right
+import math
 from pathlib import Path
 import re
+from typing import Optional
+
+import events
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+# Once the probe stops moving forwards it's in the target's x range forever.
+NEVER = math.inf
 
 
 class Point:
@@ -33,116 +42,145 @@ class Area:
     def __str__(self) -> str:
         return f"{self.top_left}..{self.bottom_right}"
 
-    def contains_point(self, point: Point) -> bool:
-        return (
-            (self.top_left.x <= point.x <= self.bottom_right.x)
-            and (self.bottom_right.y <= point.y <= self.top_left.y)
-        )
 
+def triangular_number(number: int) -> int:
+    return (number * (number + 1)) // 2
 
-class Probe:
-    def __init__(self, position: Point, velocity: Velocity) -> None:
-        self.position = position
-        self.velocity = velocity
 
-    def __str__(self) -> str:
-        return f"{self.position}+{self.velocity}"
-
-    def move(self) -> None:
-        self.position = Point(self.position.x + self.velocity.x, self.position.y + self.velocity.y)
-        self.velocity = Velocity(max(self.velocity.x - 1, 0), self.velocity.y - 1)
-
-
-def aim_to_maximize_height(target_area: Area) -> Velocity:
-    initial_x_velocity = 0
-    projected_x_distance = 0
-    while projected_x_distance < target_area.top_left.x:
-        initial_x_velocity += 1
-        projected_x_distance += initial_x_velocity
-
-    initial_y_velocity = abs(target_area.bottom_right.y) - 1
-
-    return Velocity(initial_x_velocity, initial_y_velocity)
-
-
-def fire_probe_at_target_area(initial_velocity: Velocity, target_area: Area) -> list[Point]:
-    probe = Probe(Point(0, 0), initial_velocity)
-    print(f"Firing probe {probe} at target {target_area}.")
-    step = 0
-    probe_positions: list[Point] = []
-    while (
-        not target_area.contains_point(probe.position)
-        and probe.position.x <= target_area.bottom_right.x
-        and probe.position.y >= target_area.bottom_right.y
-    ):
-        step += 1
-        probe.move()
-        probe_positions.append(probe.position)
-        print(f"{step}: {probe}")
-
-    if target_area.contains_point(probe.position):
-        print("Hit the target!")
-    else:
-        print("Missed the target.")
-
-    return probe_positions
-
-
-def probe_would_hit_target_area(initial_velocity: Velocity, target_area: Area) -> bool:
-    probe = Probe(Point(0, 0), initial_velocity)
-    step = 0
-    while (
-        not target_area.contains_point(probe.position)
-        and probe.position.x <= target_area.bottom_right.x
-        and probe.position.y >= target_area.bottom_right.y
-    ):
-        step += 1
-        probe.move()
-
-    if target_area.contains_point(probe.position):
-        print(f"Firing probe with velocity {initial_velocity} would hit target {target_area} at {probe.position} after {step} steps.")
-        return True
-    else:
-        return False
+'''
+After t steps a probe fired with velocity v has moved v*t - t(t-1)/2, or (t^2 - (2v + 1)t) / -2, until drag stops it
+moving forwards after v steps.  So the steps at which it's past a position p are on one side of the roots of
+t^2 - (2v + 1)t + 2p, at ((2v + 1) +/- sqrt((2v + 1)^2 - 8p)) / 2.
+'''
+def x_position_after_steps(initial_x_velocity: int, steps: int) -> int:
+    steps = min(steps, initial_x_velocity)
+    return (initial_x_velocity * steps) - ((steps * (steps - 1)) // 2)
 
 
-def aim_all(target_area: Area) -> list[Velocity]:
-    min_x_velocity = 0
-    projected_x_distance = 0
-    while projected_x_distance < target_area.top_left.x:
-        min_x_velocity += 1
-        projected_x_distance += min_x_velocity
-    max_x_velocity = target_area.bottom_right.x
+def y_position_after_steps(initial_y_velocity: int, steps: int) -> int:
+    return (initial_y_velocity * steps) - ((steps * (steps - 1)) // 2)
+
+
+def find_x_hitting_steps(initial_x_velocity: int, target_area: Area) -> Optional[tuple[int, float]]:
+    # Returns the first and last steps at which the probe is within the target's x range, if it ever is.
+    if triangular_number(initial_x_velocity) < target_area.top_left.x:
+        return None
+    root_term = (2 * initial_x_velocity) + 1
+
+    first_step = max(1, (root_term - math.isqrt((root_term * root_term) - (8 * target_area.top_left.x))) // 2)
+    while x_position_after_steps(initial_x_velocity, first_step) < target_area.top_left.x:
+        first_step += 1
+    while first_step > 1 and x_position_after_steps(initial_x_velocity, first_step - 1) >= target_area.top_left.x:
+        first_step -= 1
+
+    if triangular_number(initial_x_velocity) <= target_area.bottom_right.x:
+        return first_step, NEVER
+    last_step = (root_term - math.isqrt((root_term * root_term) - (8 * target_area.bottom_right.x))) // 2
+    while x_position_after_steps(initial_x_velocity, last_step + 1) <= target_area.bottom_right.x:
+        last_step += 1
+    while last_step > 0 and x_position_after_steps(initial_x_velocity, last_step) > target_area.bottom_right.x:
+        last_step -= 1
+
+    return (first_step, last_step) if first_step <= last_step else None
+
+
+def find_y_hitting_steps(initial_y_velocity: int, target_area: Area) -> Optional[tuple[int, int]]:
+    # Returns the first and last steps at which the probe is within the target's y range, if it ever is.
+    root_term = (2 * initial_y_velocity) + 1
+
+    first_step = max(1, (root_term + math.isqrt((root_term * root_term) - (8 * target_area.top_left.y))) // 2)
+    while y_position_after_steps(initial_y_velocity, first_step) > target_area.top_left.y:
+        first_step += 1
+    while first_step > 1 and y_position_after_steps(initial_y_velocity, first_step - 1) <= target_area.top_left.y:
+        first_step -= 1
+
+    last_step = (root_term + math.isqrt((root_term * root_term) - (8 * target_area.bottom_right.y))) // 2
+    while y_position_after_steps(initial_y_velocity, last_step + 1) >= target_area.bottom_right.y:
+        last_step += 1
+    while last_step > 0 and y_position_after_steps(initial_y_velocity, last_step) < target_area.bottom_right.y:
+        last_step -= 1
 
+    return (first_step, last_step) if first_step <= last_step else None
+
+
+def find_hitting_steps(target_area: Area) -> tuple[dict[int, tuple[int, float]], dict[int, tuple[int, int]]]:
+    if target_area.top_left.x <= 0 or target_area.top_left.y >= 0:
+        raise Exception(f"The target area must be ahead of and below the probe:  {target_area}")
+
+    # Faster than this and the probe overshoots the target after a single step.  Fired upwards, it comes back down to
+    # 0 with one more than its initial speed, so faster than this and it overshoots the target on the way back.
+    max_x_velocity = target_area.bottom_right.x
     min_y_velocity = target_area.bottom_right.y
     max_y_velocity = abs(target_area.bottom_right.y) - 1
 
-    print(f"Possible initial x velocity:  {min_x_velocity}..{max_x_velocity}")
-    print(f"Possible initial y velocity:  {min_y_velocity}..{max_y_velocity}")
-    print(f"Possible initial volicity count:  {(max_x_velocity - min_x_velocity + 1) * (max_y_velocity - min_y_velocity + 1)}")
+    x_hitting_steps = {
+        initial_x_velocity: hitting_steps
+        for initial_x_velocity in range(1, max_x_velocity + 1)
+        if (hitting_steps := find_x_hitting_steps(initial_x_velocity, target_area))
+    }
+    y_hitting_steps = {
+        initial_y_velocity: hitting_steps
+        for initial_y_velocity in range(min_y_velocity, max_y_velocity + 1)
+        if (hitting_steps := find_y_hitting_steps(initial_y_velocity, target_area))
+    }
+    events.emit(
+        events.DETAIL,
+        "Initial velocities that hit the target's x range:  {x_velocity_count}, y range:  {y_velocity_count}",
+        x_velocity_count=len(x_hitting_steps),
+        y_velocity_count=len(y_hitting_steps)
+    )
+    return x_hitting_steps, y_hitting_steps
+
+
+def count_hitting_velocities(target_area: Area) -> int:
+    # A velocity hits the target when the steps it's within the x range overlap the steps it's within the y range.
+    # Of all the pairs, those that don't overlap are the ones where one range ends before the other starts.
+    x_hitting_steps, y_hitting_steps = find_hitting_steps(target_area)
+    x_first_steps = sorted(first_step for first_step, _ in x_hitting_steps.values())
+    x_last_steps = sorted(last_step for _, last_step in x_hitting_steps.values())
+    hitting_velocity_count = 0
+    for y_first_step, y_last_step in y_hitting_steps.values():
+        x_ending_before_count = bisect_left(x_last_steps, y_first_step)
+        x_starting_after_count = len(x_first_steps) - bisect_right(x_first_steps, y_last_step)
+        hitting_velocity_count += len(x_first_steps) - x_ending_before_count - x_starting_after_count
+    return hitting_velocity_count
+
+
+def aim_all(target_area: Area) -> list[Velocity]:
+    x_hitting_steps, y_hitting_steps = find_hitting_steps(target_area)
     return [
-        velocity
-        for velocity in (
-            Velocity(x, y)
-            for x in range(min_x_velocity, max_x_velocity + 1)
-            for y in range(min_y_velocity, max_y_velocity + 1)
-        )
-        if probe_would_hit_target_area(velocity, target_area)
+        Velocity(initial_x_velocity, initial_y_velocity)
+        for initial_x_velocity, (x_first_step, x_last_step) in x_hitting_steps.items()
+        for initial_y_velocity, (y_first_step, y_last_step) in y_hitting_steps.items()
+        if x_first_step <= y_last_step and y_first_step <= x_last_step
     ]
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
+def find_max_height(target_area: Area) -> int:
+    x_hitting_steps, y_hitting_steps = find_hitting_steps(target_area)
+    for initial_y_velocity in sorted(y_hitting_steps, reverse=True):
+        y_first_step, y_last_step = y_hitting_steps[initial_y_velocity]
+        if any(x_first_step <= y_last_step and y_first_step <= x_last_step for x_first_step, x_last_step in x_hitting_steps.values()):
+            # Fired downwards, the probe is highest after its first step.
+            return triangular_number(initial_y_velocity) if initial_y_velocity > 0 else initial_y_velocity
+    raise Exception(f"No initial velocity hits the target area:  {target_area}")
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> Area:
+    with open(input_file_path) as file:
         line = file.readline().rstrip()
         match = re.match(r'target area: *x=(-?\d+)\.\.(-?\d+), *y=(-?\d+)\.\.(-?\d+)', line)
-        target_area = Area((int(match[1]), int(match[2])), (int(match[3]), int(match[4])))
+        return Area((int(match[1]), int(match[2])), (int(match[3]), int(match[4])))
+
 
-    print(f"Target area:  {target_area}")
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return find_max_height(parse_input(input_file_path))
 
-    initial_velocity = aim_to_maximize_height(target_area)
-    probe_positions = fire_probe_at_target_area(initial_velocity, target_area)
-    max_probe_height = max(position.y for position in probe_positions)
-    print(f"Max probe height:  {max_probe_height}")
 
-    initial_velocities = aim_all(target_area)
-    print(f"Successful initial velocity count:  {len(initial_velocities)}")
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return count_hitting_velocities(parse_input(input_file_path))
+
+
+if __name__ == '__main__':
+    print(f"Max probe height:  {solve_part_1()}")
+    print(f"Successful initial velocity count:  {solve_part_2()}")
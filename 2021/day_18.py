@@ -1,12 +1,22 @@
 #!/usr/bin/env python
 
 from __future__ import annotations
+import functools
+import itertools
 import math
+import os
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, Callable, Optional, Union
+
+import events
+from parallel import map_in_parallel
+from puzzle_input import iter_lines
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+ROWS_PER_BLOCK = 10
 
 
 class SnailfishNumber:
@@ -131,22 +141,255 @@ class SnailfishNumberIndex:
         self.depth = depth
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        snailfish_numbers = [SnailfishNumber.from_string(line.rstrip()) for line in file]
+class FlatSnailfishNumber:
+    # The regular numbers in order, each with how many pairs it's nested in.  Numbers are immutable, so they can be
+    # shared between sums without copying.
+    def __init__(self, values: tuple[int, ...], depths: tuple[int, ...]) -> None:
+        self.values = values
+        self.depths = depths
+
+    def __str__(self) -> str:
+        return self.fold(lambda left, right: f"[{left},{right}]", str)
+
+    def __add__(self, other: FlatSnailfishNumber) -> FlatSnailfishNumber:
+        values = list(self.values + other.values)
+        depths = [depth + 1 for depth in self.depths + other.depths]
+        reduce_flat_snailfish_number(values, depths)
+        return FlatSnailfishNumber(tuple(values), tuple(depths))
+
+    def fold(self, combine: Callable[[Any, Any], Any], convert: Callable[[int], Any] = lambda value: value) -> Any:
+        # Combines each pair as soon as both its halves are on the stack.
+        stack: list[tuple[Any, int]] = []
+        for value, depth in zip(self.values, self.depths):
+            folded = convert(value)
+            while stack and stack[-1][1] == depth:
+                folded = combine(stack.pop()[0], folded)
+                depth -= 1
+            stack.append((folded, depth))
+        if len(stack) != 1 or stack[0][1] != 0:
+            raise Exception(f"Invalid snailfish number:  {self.values} at depths {self.depths}")
+        return stack[0][0]
+
+    @property
+    def magnitude(self) -> int:
+        return self.fold(lambda left, right: (left * 3) + (right * 2))
+
+    @classmethod
+    def from_string(cls, source: str) -> FlatSnailfishNumber:
+        values: list[int] = []
+        depths: list[int] = []
+        depth = 0
+        value_start = None
+        for index, char in enumerate(source):
+            if char.isdigit():
+                if value_start is None:
+                    value_start = index
+                continue
+            if value_start is not None:
+                values.append(int(source[value_start:index]))
+                depths.append(depth)
+                value_start = None
+            if char == '[':
+                depth += 1
+            elif char == ']':
+                depth -= 1
+            elif char != ',':
+                raise Exception(f"Couldn't parse snailfish number:  {source}")
+        if depth != 0 or value_start is not None:
+            raise Exception(f"Couldn't parse snailfish number:  {source}")
+        return cls(tuple(values), tuple(depths))
+
+
+def reduce_flat_snailfish_number(values: list[int], depths: list[int]) -> None:
+    # Numbers being added are already reduced, so pairs nested in 4 others are the only ones to explode.  Exploding
+    # never nests anything deeper, so they can all go in one pass, each one's right value carried into the next.
+    exploded_values: list[int] = []
+    exploded_depths: list[int] = []
+    carried_value = 0
+    index = 0
+    while index < len(values):
+        if depths[index] > 4:
+            if exploded_values:
+                exploded_values[-1] += values[index] + carried_value
+            carried_value = values[index + 1]
+            exploded_values.append(0)
+            exploded_depths.append(depths[index] - 1)
+            index += 2
+        else:
+            exploded_values.append(values[index] + carried_value)
+            exploded_depths.append(depths[index])
+            carried_value = 0
+            index += 1
+    values[:] = exploded_values
+    depths[:] = exploded_depths
+
+    # Splits go left to right.  A split that makes a pair nested in 4 others explodes straight away, which can make
+    # the number to its left big enough to split, so that's where to carry on from.
+    index = 0
+    while index < len(values):
+        value = values[index]
+        if value < 10:
+            index += 1
+            continue
+        left_value = value // 2
+        right_value = value - left_value
+        depth = depths[index]
+        if depth < 4:
+            values[index:index + 1] = [left_value, right_value]
+            depths[index:index + 1] = [depth + 1, depth + 1]
+            continue
+        values[index] = 0
+        if index + 1 < len(values):
+            values[index + 1] += right_value
+        if index > 0:
+            values[index - 1] += left_value
+            index -= 1
+
+
+class LargestSumSearch:
+    def __init__(self, snailfish_numbers: list[FlatSnailfishNumber]) -> None:
+        self.snailfish_numbers = snailfish_numbers
+        self.value_totals = [sum(snailfish_number.values) for snailfish_number in snailfish_numbers]
+        # Numbers with the biggest value totals, and so the biggest possible sums, are searched first.
+        self.search_order = sorted(range(len(snailfish_numbers)), key=lambda index: self.value_totals[index], reverse=True)
+
+    def max_row_magnitude(self, row: int) -> int:
+        # The most any sum in a row could be, which is with whichever other number has the biggest value total.
+        index = self.search_order[row]
+        other_index = self.search_order[1] if row == 0 else self.search_order[0]
+        return max_reduced_magnitude(self.value_totals[index] + self.value_totals[other_index])
+
+    def search_rows(self, first_row: int, end_row: int, best_sum: Optional[tuple[int, int, int]] = None) -> Optional[tuple[int, int, int]]:
+        # Returns the (magnitude, index a, index b) of the largest sum a + b starting with a number in these rows, if
+        # it's bigger than the best sum so far.  Ties go to the sum that comes first in input order.
+        best_magnitude = best_sum[0] if best_sum else -1
+        found_best_sum = None
+        for row in range(first_row, end_row):
+            if self.max_row_magnitude(row) < best_magnitude:
+                break
+            index_a = self.search_order[row]
+            snailfish_number_a = self.snailfish_numbers[index_a]
+            value_total_a = self.value_totals[index_a]
+            for index_b in self.search_order:
+                if index_b == index_a:
+                    continue
+                if max_reduced_magnitude(value_total_a + self.value_totals[index_b]) < best_magnitude:
+                    break
+                candidate_sum = ((snailfish_number_a + self.snailfish_numbers[index_b]).magnitude, index_a, index_b)
+                if is_better_sum(candidate_sum, best_sum):
+                    found_best_sum = best_sum = candidate_sum
+                    best_magnitude = candidate_sum[0]
+        return found_best_sum
+
+
+def is_better_sum(candidate_sum: tuple[int, int, int], best_sum: Optional[tuple[int, int, int]]) -> bool:
+    if not best_sum:
+        return True
+    candidate_magnitude, candidate_index_a, candidate_index_b = candidate_sum
+    best_magnitude, best_index_a, best_index_b = best_sum
+    return candidate_magnitude > best_magnitude or (candidate_magnitude == best_magnitude and (candidate_index_a, candidate_index_b) < (best_index_a, best_index_b))
 
+
+# The magnitude weights of the 16 places a regular number can be in a reduced number, heaviest first.  A regular
+# number less deeply nested weighs less than the leftmost place below it.
+REDUCED_PLACE_WEIGHTS = sorted(
+    (math.prod(3 if is_left else 2 for is_left in place) for place in itertools.product((True, False), repeat=4)),
+    reverse=True
+)
+MAX_REGULAR_VALUE = 9
+
+
+@functools.lru_cache(maxsize=None)
+def max_reduced_magnitude(value_total: int) -> int:
+    # Reducing never adds to the total of the regular values, so a sum's magnitude is at most that total spread over
+    # the heaviest places, at most 9 in each.
+    max_magnitude = 0
+    for weight in REDUCED_PLACE_WEIGHTS:
+        if value_total <= 0:
+            break
+        max_magnitude += weight * min(value_total, MAX_REGULAR_VALUE)
+        value_total -= MAX_REGULAR_VALUE
+    return max_magnitude
+
+
+worker_largest_sum_search: Optional[LargestSumSearch] = None
+
+
+def start_largest_sum_worker(snailfish_numbers: list[FlatSnailfishNumber]) -> None:
+    global worker_largest_sum_search
+    worker_largest_sum_search = LargestSumSearch(snailfish_numbers)
+
+
+def search_largest_sum_rows(first_row: int, end_row: int, best_sum: Optional[tuple[int, int, int]]) -> Optional[tuple[int, int, int]]:
+    return worker_largest_sum_search.search_rows(first_row, end_row, best_sum)
+
+
+def find_largest_sum(
+    snailfish_numbers: list[FlatSnailfishNumber],
+    jobs: Optional[int] = 1,
+    rows_per_block: int = ROWS_PER_BLOCK
+) -> tuple[FlatSnailfishNumber, FlatSnailfishNumber, FlatSnailfishNumber]:
+    # Only the best sum so far is kept.  With more than one job, blocks of rows are searched across a process pool,
+    # each one skipping the sums that can't beat the best sum when it was handed out.
+    if len(snailfish_numbers) < 2:
+        raise Exception("Need at least two snailfish numbers to add.")
+    largest_sum_search = LargestSumSearch(snailfish_numbers)
+    row_blocks = ((first_row, min(first_row + rows_per_block, len(snailfish_numbers))) for first_row in range(0, len(snailfish_numbers), rows_per_block))
+    best_sum = None
+
+    def update_best_sum(found_best_sum: Optional[tuple[int, int, int]]) -> None:
+        nonlocal best_sum
+        if found_best_sum and is_better_sum(found_best_sum, best_sum):
+            best_sum = found_best_sum
+            events.emit(events.PROGRESS, "Largest magnitude so far:  {magnitude}", magnitude=best_sum[0])
+
+    def can_beat_best_sum(first_row: int) -> bool:
+        return not best_sum or largest_sum_search.max_row_magnitude(first_row) >= best_sum[0]
+
+    if jobs == 1 or (jobs is None and (os.cpu_count() or 1) == 1):
+        for first_row, end_row in row_blocks:
+            if not can_beat_best_sum(first_row):
+                break
+            update_best_sum(largest_sum_search.search_rows(first_row, end_row, best_sum))
+    else:
+        # The best sum is read as each block is handed out, so later blocks skip more.
+        block_arguments = (
+            (first_row, end_row, best_sum)
+            for first_row, end_row in itertools.takewhile(lambda row_block: can_beat_best_sum(row_block[0]), row_blocks)
+        )
+        block_sums = map_in_parallel(
+            search_largest_sum_rows,
+            block_arguments,
+            jobs,
+            initializer=start_largest_sum_worker,
+            initargs=(snailfish_numbers,)
+        )
+        for block_sum in block_sums:
+            update_best_sum(block_sum)
+
+    _, index_a, index_b = best_sum
+    events.emit(events.DETAIL, "Largest sum is numbers {number_a} + {number_b}.", number_a=index_a + 1, number_b=index_b + 1)
+    return snailfish_numbers[index_a], snailfish_numbers[index_b], snailfish_numbers[index_a] + snailfish_numbers[index_b]
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> list[FlatSnailfishNumber]:
+    return [FlatSnailfishNumber.from_string(line) for line in iter_lines(input_file_path) if line]
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    snailfish_numbers = parse_input(input_file_path)
     total = snailfish_numbers[0]
     for snailfish_number in snailfish_numbers[1:]:
-        print(f"  {total}")
-        print(f"+ {snailfish_number}")
         total = total + snailfish_number
-        print(f"= {total} ({total.magnitude})\n")
-
-    sums = [
-        (a, b, a + b)
-        for a in snailfish_numbers
-        for b in snailfish_numbers
-        if a != b
-    ]
-    max_sum = max(sums, key=lambda sum: sum[2].magnitude)
-    print(f"Largest sum of two snailfish numbers:\n  {max_sum[0]}\n+ {max_sum[1]}\n= {max_sum[2]} ({max_sum[2].magnitude})")
+    return total.magnitude
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    # Searching in process keeps all the work in this process's CPU time, and leaves the CPUs to the runners.
+    _, _, max_sum = find_largest_sum(parse_input(input_file_path), jobs=1)
+    return max_sum.magnitude
+
+
+if __name__ == '__main__':
+    print(f"Magnitude of the final sum:  {solve_part_1()}")
+    print(f"Largest magnitude of any sum of two snailfish numbers:  {solve_part_2()}")
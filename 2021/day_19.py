@@ -1,12 +1,18 @@
 #!/usr/bin/env python
 
+from collections import Counter, defaultdict, deque
 import itertools
+import math
+import operator
 from pathlib import Path
 import re
-from typing import Optional
+from typing import Callable, Optional
+
+import events
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 # (coordinate order), (coordinate polarity)
 COORDINATE_ROTATIONS: tuple[tuple[tuple[int, int, int], tuple[int, int, int]]] = (
@@ -42,6 +48,13 @@ COORDINATE_ROTATIONS: tuple[tuple[tuple[int, int, int], tuple[int, int, int]]] =
 )
 
 
+MIN_OVERLAPPING_BEACONS = 12
+# Coordinates are packed into one int per beacon, with room for any coordinate or offset within half the base.
+COORDINATE_PACKING_BASE = 1 << 32
+# Overlapping scanners see at least this many of the same distances, one between each pair of overlapping beacons.
+MIN_SHARED_DISTANCES = math.comb(MIN_OVERLAPPING_BEACONS, 2)
+
+
 class Scanner:
     def __init__(self, number: int) -> None:
         self.number = number
@@ -49,6 +62,48 @@ class Scanner:
         self.beacon_coordinates: set[tuple[int, int, int]] = set()
 
 
+class ScannerFingerprint:
+    # Squared distances between beacons don't depend on where a scanner is or which way it faces, so pairs of beacons
+    # indexed by their distances find the same beacons seen by other scanners.
+    def __init__(self, scanner: Scanner) -> None:
+        # Kept in the same frame as the scanner's beacon coordinates.
+        self.beacons = sorted(scanner.beacon_coordinates)
+        self.beacon_pairs_by_distance: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        for (beacon_index_a, beacon_a), (beacon_index_b, beacon_b) in itertools.combinations(enumerate(self.beacons), 2):
+            self.beacon_pairs_by_distance[squared_distance(beacon_a, beacon_b)].append((beacon_index_a, beacon_index_b))
+
+
+def squared_distance(point_a: tuple[int, int, int], point_b: tuple[int, int, int]) -> int:
+    return (
+        ((point_a[0] - point_b[0]) ** 2)
+        + ((point_a[1] - point_b[1]) ** 2)
+        + ((point_a[2] - point_b[2]) ** 2)
+    )
+
+
+def emit_aligned_scanner(scanner: Scanner, aligned_scanner: Scanner) -> None:
+    events.emit(
+        events.PROGRESS,
+        "Aligned scanner {scanner_number} at {scanner_coordinates} with scanner {aligned_scanner_number} at {aligned_scanner_coordinates}.",
+        scanner_number=scanner.number,
+        scanner_coordinates=scanner.coordinates,
+        aligned_scanner_number=aligned_scanner.number,
+        aligned_scanner_coordinates=aligned_scanner.coordinates
+    )
+
+
+def rotate_coordinates(
+    coordinates: tuple[int, int, int],
+    coordinate_order: tuple[int, int, int],
+    coordinate_polarity: tuple[int, int, int]
+) -> tuple[int, int, int]:
+    return (
+        coordinates[coordinate_order[0]] * coordinate_polarity[0],
+        coordinates[coordinate_order[1]] * coordinate_polarity[1],
+        coordinates[coordinate_order[2]] * coordinate_polarity[2]
+    )
+
+
 def rotate_coordinates_set(
     coordinates_set: set[tuple[int, int, int]],
     coordinate_order: tuple[int, int, int],
@@ -91,11 +146,111 @@ def align_scanner(scanner: Scanner, aligned_scanners: list[Scanner]) -> bool:
                     if len(possible_aligned_beacon_coordinates.intersection(aligned_scanner.beacon_coordinates)) >= 12:
                         scanner.coordinates = possible_offset
                         scanner.beacon_coordinates = possible_aligned_beacon_coordinates
-                        print(f"Aligned scanner {scanner.number} at {scanner.coordinates} with scanner {aligned_scanner.number} at {aligned_scanner.coordinates}.")
+                        emit_aligned_scanner(scanner, aligned_scanner)
                         return True
     return False
 
 
+def pack_coordinates(coordinates: tuple[int, int, int]) -> int:
+    # Packing is linear, so the difference between two packed beacons is their packed offset.
+    return (((coordinates[0] * COORDINATE_PACKING_BASE) + coordinates[1]) * COORDINATE_PACKING_BASE) + coordinates[2]
+
+
+def unpack_coordinates(packed_coordinates: int) -> tuple[int, int, int]:
+    half_base = COORDINATE_PACKING_BASE // 2
+    z = ((packed_coordinates + half_base) % COORDINATE_PACKING_BASE) - half_base
+    packed_coordinates = (packed_coordinates - z) // COORDINATE_PACKING_BASE
+    y = ((packed_coordinates + half_base) % COORDINATE_PACKING_BASE) - half_base
+    x = (packed_coordinates - y) // COORDINATE_PACKING_BASE
+    return x, y, z
+
+
+def find_packed_rotation_weights(coordinate_order: tuple[int, int, int], coordinate_polarity: tuple[int, int, int]) -> tuple[int, int, int]:
+    # What each of x, y and z is multiplied by to rotate and pack coordinates in one go.
+    weights = [0, 0, 0]
+    for index in range(3):
+        weights[coordinate_order[index]] = coordinate_polarity[index] * (COORDINATE_PACKING_BASE ** (2 - index))
+    return weights[0], weights[1], weights[2]
+
+
+PACKED_ROTATION_WEIGHTS = tuple(
+    find_packed_rotation_weights(coordinate_order, coordinate_polarity)
+    for coordinate_order, coordinate_polarity in COORDINATE_ROTATIONS
+)
+
+
+def rotate_and_pack_coordinates_set(coordinates_set: set[tuple[int, int, int]]) -> list[list[int]]:
+    # The packed coordinates under each of the rotations, in the same order as COORDINATE_ROTATIONS.
+    return [
+        [(x * x_weight) + (y * y_weight) + (z * z_weight) for x, y, z in coordinates_set]
+        for x_weight, y_weight, z_weight in PACKED_ROTATION_WEIGHTS
+    ]
+
+
+class VotingScannerAligner:
+    # A drop-in alternative to align_scanner.  Every pair of a rotated beacon and an aligned beacon votes for the offset
+    # between them, so each rotation costs one histogram of differences instead of a set intersection per offset.
+    # Rotated beacons are packed once per scanner, aligned beacons once per aligned scanner, and scanners that failed
+    # to align with an aligned scanner never will, so they aren't tried again.
+    def __init__(self) -> None:
+        self.rotated_packed_beacons: dict[Scanner, list[list[int]]] = {}
+        self.signed_axis_values: dict[Scanner, dict[tuple[int, int], list[int]]] = {}
+        self.packed_aligned_beacons: dict[Scanner, list[int]] = {}
+        self.aligned_x_values: dict[Scanner, list[int]] = {}
+        self.tried_scanner_pairs: set[tuple[Scanner, Scanner]] = set()
+
+    def __call__(self, scanner: Scanner, aligned_scanners: list[Scanner]) -> bool:
+        if scanner not in self.rotated_packed_beacons:
+            self.rotated_packed_beacons[scanner] = rotate_and_pack_coordinates_set(scanner.beacon_coordinates)
+            self.signed_axis_values[scanner] = {
+                (axis, polarity): [coordinates[axis] * polarity for coordinates in scanner.beacon_coordinates]
+                for axis, polarity in itertools.product(range(3), (1, -1))
+            }
+
+        for aligned_scanner in aligned_scanners:
+            if (scanner, aligned_scanner) in self.tried_scanner_pairs:
+                continue
+            self.tried_scanner_pairs.add((scanner, aligned_scanner))
+            if aligned_scanner not in self.packed_aligned_beacons:
+                self.packed_aligned_beacons[aligned_scanner] = list(map(pack_coordinates, aligned_scanner.beacon_coordinates))
+                self.aligned_x_values[aligned_scanner] = [coordinates[0] for coordinates in aligned_scanner.beacon_coordinates]
+            if self.align_scanner_with(scanner, aligned_scanner):
+                del self.rotated_packed_beacons[scanner]
+                del self.signed_axis_values[scanner]
+                emit_aligned_scanner(scanner, aligned_scanner)
+                return True
+        return False
+
+    def align_scanner_with(self, scanner: Scanner, aligned_scanner: Scanner) -> bool:
+        # Overlapping beacons agree on the x offset too, so voting on x alone first rules out all but the rotations
+        # that turn the right axis, the right way, into x.  Those votes are over small ints, and there are 6 of them
+        # rather than 24.
+        aligned_x_values = self.aligned_x_values[aligned_scanner]
+        possible_x_axes = {
+            signed_axis
+            for signed_axis, values in self.signed_axis_values[scanner].items()
+            if max(Counter(itertools.starmap(operator.sub, itertools.product(aligned_x_values, values))).values(), default=0) >= MIN_OVERLAPPING_BEACONS
+        }
+        if not possible_x_axes:
+            return False
+
+        packed_aligned_beacons = self.packed_aligned_beacons[aligned_scanner]
+        for (coordinate_order, coordinate_polarity), packed_beacons in zip(COORDINATE_ROTATIONS, self.rotated_packed_beacons[scanner]):
+            if (coordinate_order[0], coordinate_polarity[0]) not in possible_x_axes:
+                continue
+            offset_votes = Counter(itertools.starmap(operator.sub, itertools.product(packed_aligned_beacons, packed_beacons)))
+            packed_offset, vote_count = offset_votes.most_common(1)[0]
+            # The beacons in each set are distinct, so each vote for an offset is a different overlapping beacon.
+            if vote_count >= MIN_OVERLAPPING_BEACONS:
+                scanner.coordinates = unpack_coordinates(packed_offset)
+                scanner.beacon_coordinates = {unpack_coordinates(packed_beacon + packed_offset) for packed_beacon in packed_beacons}
+                return True
+        return False
+
+
+ScannerAligner = Callable[[Scanner, list[Scanner]], bool]
+
+
 def manhattan_distance(point_a: tuple[int, int, int], point_b: tuple[int, int, int]) -> int:
     return (
         abs(point_a[0] - point_b[0])
@@ -104,10 +259,137 @@ def manhattan_distance(point_a: tuple[int, int, int], point_b: tuple[int, int, i
     )
 
 
-if __name__ == '__main__':
+def find_overlapping_scanners(fingerprints: list[ScannerFingerprint]) -> dict[int, set[int]]:
+    # Scanners that share enough distances between their beacons probably overlap, which makes them neighbours in the
+    # graph of scanners to align.
+    scanners_by_distance: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    for scanner_index, fingerprint in enumerate(fingerprints):
+        for distance, beacon_pairs in fingerprint.beacon_pairs_by_distance.items():
+            scanners_by_distance[distance].append((scanner_index, len(beacon_pairs)))
+
+    shared_distance_counts: Counter[tuple[int, int]] = Counter()
+    for scanner_pair_counts in scanners_by_distance.values():
+        for (scanner_index_a, pair_count_a), (scanner_index_b, pair_count_b) in itertools.combinations(scanner_pair_counts, 2):
+            shared_distance_counts[(scanner_index_a, scanner_index_b)] += min(pair_count_a, pair_count_b)
+
+    overlapping_scanners: dict[int, set[int]] = defaultdict(set)
+    for (scanner_index_a, scanner_index_b), shared_distance_count in shared_distance_counts.items():
+        if shared_distance_count >= MIN_SHARED_DISTANCES:
+            overlapping_scanners[scanner_index_a].add(scanner_index_b)
+            overlapping_scanners[scanner_index_b].add(scanner_index_a)
+    return overlapping_scanners
+
+
+def match_beacons(fingerprint: ScannerFingerprint, aligned_fingerprint: ScannerFingerprint) -> list[tuple[int, int]]:
+    # Every pair of beacons at the same distance votes for its beacons being the same.  A beacon that both scanners
+    # see gets a vote from each of the other overlapping beacons.
+    votes: Counter[tuple[int, int]] = Counter()
+    for distance, beacon_pairs in fingerprint.beacon_pairs_by_distance.items():
+        aligned_beacon_pairs = aligned_fingerprint.beacon_pairs_by_distance.get(distance)
+        if not aligned_beacon_pairs:
+            continue
+        for beacon_index_a, beacon_index_b in beacon_pairs:
+            for aligned_beacon_index_a, aligned_beacon_index_b in aligned_beacon_pairs:
+                votes[(beacon_index_a, aligned_beacon_index_a)] += 1
+                votes[(beacon_index_a, aligned_beacon_index_b)] += 1
+                votes[(beacon_index_b, aligned_beacon_index_a)] += 1
+                votes[(beacon_index_b, aligned_beacon_index_b)] += 1
+    return [beacon_indexes for beacon_indexes, vote_count in votes.items() if vote_count >= MIN_OVERLAPPING_BEACONS - 1]
+
+
+def align_scanner_by_fingerprints(
+    scanner: Scanner,
+    fingerprint: ScannerFingerprint,
+    aligned_scanner: Scanner,
+    aligned_fingerprint: ScannerFingerprint
+) -> bool:
+    matched_beacons = [
+        (fingerprint.beacons[beacon_index], aligned_fingerprint.beacons[aligned_beacon_index])
+        for beacon_index, aligned_beacon_index in match_beacons(fingerprint, aligned_fingerprint)
+    ]
+    if len(matched_beacons) < MIN_OVERLAPPING_BEACONS:
+        return False
+
+    # Only rotations that carry the matched beacons onto each other with the same offset are worth checking.
+    for coordinate_order, coordinate_polarity in COORDINATE_ROTATIONS:
+        offset_counts: Counter[tuple[int, int, int]] = Counter()
+        for beacon, aligned_beacon in matched_beacons:
+            rotated_beacon = rotate_coordinates(beacon, coordinate_order, coordinate_polarity)
+            offset_counts[(
+                aligned_beacon[0] - rotated_beacon[0],
+                aligned_beacon[1] - rotated_beacon[1],
+                aligned_beacon[2] - rotated_beacon[2]
+            )] += 1
+        possible_offset, offset_count = offset_counts.most_common(1)[0]
+        if offset_count < MIN_OVERLAPPING_BEACONS:
+            continue
+
+        aligned_beacons = move_coordinates_set(
+            rotate_coordinates_set(set(fingerprint.beacons), coordinate_order, coordinate_polarity),
+            possible_offset
+        )
+        if len(aligned_beacons & aligned_scanner.beacon_coordinates) >= MIN_OVERLAPPING_BEACONS:
+            scanner.coordinates = possible_offset
+            scanner.beacon_coordinates = aligned_beacons
+            rotated_beacons = (rotate_coordinates(beacon, coordinate_order, coordinate_polarity) for beacon in fingerprint.beacons)
+            fingerprint.beacons = [
+                (x + possible_offset[0], y + possible_offset[1], z + possible_offset[2])
+                for x, y, z in rotated_beacons
+            ]
+            emit_aligned_scanner(scanner, aligned_scanner)
+            return True
+    return False
+
+
+def align_scanners(scanners: list[Scanner], scanner_aligner: Optional[ScannerAligner] = None) -> list[Scanner]:
+    # A breadth-first search of the overlapping scanners, starting with the first scanner, unless there's a scanner
+    # aligner to search with instead.
+    if scanner_aligner:
+        return align_scanners_by_search(scanners, scanner_aligner)
+
+    fingerprints = [ScannerFingerprint(scanner) for scanner in scanners]
+    overlapping_scanners = find_overlapping_scanners(fingerprints)
+    scanners[0].coordinates = (0, 0, 0)
+    aligned_scanner_indexes = {0}
+    aligned_scanners = [scanners[0]]
+    scanner_indexes_to_search = deque([0])
+    while scanner_indexes_to_search:
+        aligned_scanner_index = scanner_indexes_to_search.popleft()
+        for scanner_index in sorted(overlapping_scanners[aligned_scanner_index] - aligned_scanner_indexes):
+            if align_scanner_by_fingerprints(
+                scanners[scanner_index],
+                fingerprints[scanner_index],
+                scanners[aligned_scanner_index],
+                fingerprints[aligned_scanner_index]
+            ):
+                aligned_scanner_indexes.add(scanner_index)
+                aligned_scanners.append(scanners[scanner_index])
+                scanner_indexes_to_search.append(scanner_index)
+
+    if len(aligned_scanners) < len(scanners):
+        raise Exception("Failed to align any more scanners.")
+    return aligned_scanners
+
+
+def align_scanners_by_search(scanners: list[Scanner], scanner_aligner: ScannerAligner = align_scanner) -> list[Scanner]:
+    # Tries every rotation and offset against every aligned scanner, without any fingerprints.
+    initial_scanner = scanners[0]
+    initial_scanner.coordinates = (0, 0, 0)
+    aligned_scanners = [initial_scanner]
+    scanners_to_align = list(scanners[1:])
+    while scanners_to_align:
+        still_unaligned_scanners = [scanner for scanner in scanners_to_align if not scanner_aligner(scanner, aligned_scanners)]
+        if len(still_unaligned_scanners) == len(scanners_to_align):
+            raise Exception("Failed to align any more scanners.")
+        aligned_scanners.extend(scanner for scanner in scanners_to_align if scanner not in still_unaligned_scanners)
+        scanners_to_align = still_unaligned_scanners
+    return aligned_scanners
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> list[Scanner]:
     scanners: list[Scanner] = []
 
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
+    with open(input_file_path) as file:
         lines = (line.rstrip() for line in file)
         for line in lines:
             if line:
@@ -117,33 +399,41 @@ if __name__ == '__main__':
                 else:
                     current_scanner.beacon_coordinates.add(tuple(int(number_str) for number_str in line.split(',')))
 
-    initial_scanner = scanners[0]
-    initial_scanner.coordinates = (0, 0, 0)
-    aligned_scanners = [initial_scanner]
-    scanners_to_align = list(scanners[1:])
-    while scanners_to_align:
-        for scanner in scanners_to_align:
-            if align_scanner(scanner, aligned_scanners):
-                aligned_scanners.append(scanner)
-                scanners_to_align.remove(scanner)
-                break
-        else:
-            raise Exception("Failed to align any more scanners.")
+    return scanners
+
+
+def parse_aligned_scanners(input_file_path: Path = INPUT_FILE_PATH, scanner_aligner: Optional[ScannerAligner] = None) -> list[Scanner]:
+    return align_scanners(parse_input(input_file_path), scanner_aligner)
+
 
+def count_beacons(aligned_scanners: list[Scanner]) -> int:
     all_beacon_coordinates = set(
         beacon_coordinates
         for scanner in aligned_scanners
         for beacon_coordinates in scanner.beacon_coordinates
     )
-    print(f"Beacons count:  {len(all_beacon_coordinates)}")
+    return len(all_beacon_coordinates)
 
-    scanner_distances = [
-        (scanner_a, scanner_b, manhattan_distance(scanner_a.coordinates, scanner_b.coordinates))
+
+def find_largest_scanner_distance(aligned_scanners: list[Scanner]) -> int:
+    return max(
+        manhattan_distance(scanner_a.coordinates, scanner_b.coordinates)
         for scanner_a, scanner_b in itertools.combinations(aligned_scanners, 2)
-    ]
-    scanner_a, scanner_b, max_scanner_distance = max(scanner_distances, key=lambda scanner_distance: scanner_distance[2])
-    print(
-        f"Largest Manhattan distance is {max_scanner_distance}"
-        f" between scanner {scanner_a.number} at {scanner_a.coordinates}"
-        f" and scanner {scanner_b.number} at {scanner_b.coordinates}."
     )
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH, scanner_aligner: Optional[ScannerAligner] = None) -> int:
+    return count_beacons(parse_aligned_scanners(input_file_path, scanner_aligner))
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH, scanner_aligner: Optional[ScannerAligner] = None) -> int:
+    return find_largest_scanner_distance(parse_aligned_scanners(input_file_path, scanner_aligner))
+
+
+if __name__ == '__main__':
+    events.add_event_handler(events.print_event, events.PROGRESS)
+
+    # Both answers come from the same aligned scanners, so they're only aligned once here.
+    aligned_scanners = parse_aligned_scanners()
+    print(f"Beacons count:  {count_beacons(aligned_scanners)}")
+    print(f"Largest Manhattan distance between scanners:  {find_largest_scanner_distance(aligned_scanners)}")
@@ -1,63 +1,117 @@
 #!/usr/bin/env python
 
+from __future__ import annotations
+from array import array
+import itertools
+import operator
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from parallel import CHUNK_SIZE, map_chunks_in_parallel
+from puzzle_input import iter_lines
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
-def move_submarine(commands: list[str]) -> tuple[int, int]:
-    horizontal_position = 0
-    depth = 0
+class CompiledCommands:
+    # Every command either moves forward or changes the aim, so each one is stored as a pair of changes, one of them zero.
+    def __init__(self, horizontal_changes: array, aim_changes: array) -> None:
+        self.horizontal_changes = horizontal_changes
+        self.aim_changes = aim_changes
 
-    for command in commands:
-        move, distance = command.split()
-        if move == 'forward':
-            horizontal_position += int(distance)
-        elif move == 'down':
-            depth += int(distance)
-        elif move == 'up':
-            depth -= int(distance)
-        else:
-            raise Exception(f"Unknown command:  {command}")
+    def __len__(self) -> int:
+        return len(self.horizontal_changes)
 
-    return horizontal_position, depth
 
+class MoveSummary:
+    # With the first interpretation of the commands the aim is the depth, with the second it's the rate of descent.
+    def __init__(self, horizontal_position: int = 0, aim: int = 0, depth: int = 0) -> None:
+        self.horizontal_position = horizontal_position
+        self.aim = aim
+        self.depth = depth
 
-def move_submarine_2(commands: list[str]) -> tuple[int, int]:
-    aim = 0
-    horizontal_position = 0
-    depth = 0
+    def __add__(self, other: MoveSummary) -> MoveSummary:
+        # The later moves descend faster by however much aim the earlier moves built up.
+        return MoveSummary(
+            self.horizontal_position + other.horizontal_position,
+            self.aim + other.aim,
+            self.depth + other.depth + (self.aim * other.horizontal_position)
+        )
+
+
+def compile_commands(commands: Iterable[str]) -> CompiledCommands:
+    horizontal_changes = array('q')
+    aim_changes = array('q')
 
     for command in commands:
         move, amount = command.split()
         if move == 'forward':
-            horizontal_position += int(amount)
-            depth += aim * int(amount)
+            horizontal_changes.append(int(amount))
+            aim_changes.append(0)
         elif move == 'down':
-            aim += int(amount)
+            horizontal_changes.append(0)
+            aim_changes.append(int(amount))
         elif move == 'up':
-            aim -= int(amount)
+            horizontal_changes.append(0)
+            aim_changes.append(-int(amount))
         else:
             raise Exception(f"Unknown command:  {command}")
 
-    return horizontal_position, depth
+    return CompiledCommands(horizontal_changes, aim_changes)
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        commands = [line.rstrip() for line in file]
+def summarize_commands(compiled_commands: CompiledCommands) -> MoveSummary:
+    horizontal_changes = compiled_commands.horizontal_changes
+    aim_changes = compiled_commands.aim_changes
+    # A prefix sum of the aim changes gives the aim at every command.
+    aims = itertools.accumulate(aim_changes)
+    return MoveSummary(
+        sum(horizontal_changes),
+        sum(aim_changes),
+        sum(map(operator.mul, aims, horizontal_changes))
+    )
+
+
+def summarize_command_chunk(commands: list[str]) -> MoveSummary:
+    return summarize_commands(compile_commands(commands))
+
 
+def summarize_commands_in_parallel(commands: Iterable[str], chunk_size: int = CHUNK_SIZE, jobs: Optional[int] = None) -> MoveSummary:
+    summary = MoveSummary()
+    for chunk_summary in map_chunks_in_parallel(summarize_command_chunk, commands, jobs, chunk_size):
+        summary += chunk_summary
+    return summary
+
+
+def move_submarine(commands: Iterable[str]) -> tuple[int, int]:
+    summary = summarize_commands(compile_commands(commands))
+    return summary.horizontal_position, summary.aim
+
+
+def move_submarine_2(commands: Iterable[str]) -> tuple[int, int]:
+    summary = summarize_commands(compile_commands(commands))
+    return summary.horizontal_position, summary.depth
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> Iterator[str]:
+    return iter_lines(input_file_path)
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    horizontal_position, depth = move_submarine(parse_input(input_file_path))
+    return horizontal_position * depth
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    horizontal_position, depth = move_submarine_2(parse_input(input_file_path))
+    return horizontal_position * depth
+
+
+if __name__ == '__main__':
     print("--- Part One ---")
-    horizontal_position, depth = move_submarine(commands)
-    multiplied = horizontal_position * depth
-    print(f"Horizontal position:  {horizontal_position}")
-    print(f"Depth:  {depth}")
-    print(f"Multiplied:  {multiplied}")
+    print(f"Multiplied:  {solve_part_1()}")
 
     print("--- Part Two ---")
-    horizontal_position, depth = move_submarine_2(commands)
-    multiplied = horizontal_position * depth
-    print(f"Horizontal position:  {horizontal_position}")
-    print(f"Depth:  {depth}")
-    print(f"Multiplied:  {multiplied}")
+    print(f"Multiplied:  {solve_part_2()}")
@@ -4,6 +4,7 @@ from pathlib import Path
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
 class ImageEnhancementAlgorithm:
@@ -50,15 +51,28 @@ def enhance_image(image: Image, algorithm: str) -> Image:
     return Image(new_lines, new_default_pixel)
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
+def count_lit_pixels_after_enhancing(image_enhancement_algorithm: str, image: Image, steps: int) -> int:
+    for _ in range(steps):
+        image = enhance_image(image, image_enhancement_algorithm)
+    return str(image).count('#')
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> tuple[str, Image]:
+    with open(input_file_path) as file:
         image_enhancement_algorithm = file.readline().rstrip()
         image_lines = [line for line in (full_line.rstrip() for full_line in file) if line]
 
-    image = Image(image_lines)
-    print(image)
-    for step in range(1,51):
-        image = enhance_image(image, image_enhancement_algorithm)
-        if step in (2, 50):
-            print(f"\nEnhancement {step}:\n{image}")
-            print(f"Pixels lit:  {str(image).count('#')}")
+    return image_enhancement_algorithm, Image(image_lines)
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return count_lit_pixels_after_enhancing(*parse_input(input_file_path), 2)
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return count_lit_pixels_after_enhancing(*parse_input(input_file_path), 50)
+
+
+if __name__ == '__main__':
+    print(f"Pixels lit after 2 enhancements:  {solve_part_1()}")
+    print(f"Pixels lit after 50 enhancements:  {solve_part_2()}")
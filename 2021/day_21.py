@@ -6,8 +6,11 @@ from pathlib import Path
 import re
 from typing import Optional
 
+import events
+
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
 class Player:
@@ -77,7 +80,14 @@ class QuantumGame:
 
     def take_turn(self) -> None:
         self.turn += 1
-        print(f"Taking turn {self.turn} with {len(self.universes_per_state)} existing states for {sum(self.universes_per_state.values())} universes.")
+        if events.is_enabled(events.DETAIL):
+            events.emit(
+                events.DETAIL,
+                "Taking turn {turn} with {state_count} existing states for {universe_count} universes.",
+                turn=self.turn,
+                state_count=len(self.universes_per_state),
+                universe_count=sum(self.universes_per_state.values())
+            )
         new_universes_per_state = defaultdict(int)
         for existing_state, existing_universes in self.universes_per_state.items():
             current_player_state = existing_state[0]
@@ -95,25 +105,31 @@ class QuantumGame:
         self.universes_per_state = new_universes_per_state
 
 
-if __name__ == '__main__':
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> dict[int, int]:
     player_positions: dict[int, int] = {}
 
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
+    with open(input_file_path) as file:
         for line in file:
             if match := re.match(r'Player (\d+) starting position: *(\d+)', line):
                 player_positions[int(match[1])] = int(match[2])
 
-    practice_game = DeterministicGame(10, 100, 1000, player_positions)
+    return player_positions
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    practice_game = DeterministicGame(10, 100, 1000, parse_input(input_file_path))
     while practice_game.in_progress:
         practice_game.take_turn()
-    practice_winner = practice_game.winner
-    practice_loser = practice_game.loser
-    print(f"Player {practice_winner.number} won practice game after {practice_game.roll_count} rolls with score {practice_winner.score}.")
-    print(f"Player {practice_loser.number} lost practice game after {practice_game.roll_count} rolls with score {practice_loser.score}.")
-    print(f"Losing practice score multiplied by rolls:  {practice_loser.score * practice_game.roll_count}")
+    return practice_game.loser.score * practice_game.roll_count
 
-    real_game = QuantumGame(10, 3, 21, player_positions)
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    real_game = QuantumGame(10, 3, 21, parse_input(input_file_path))
     while real_game.in_progress:
         real_game.take_turn()
-    for player_number, wins in real_game.wins_per_player.items():
-        print(f"Player {player_number} won {wins} games.")
+    return max(real_game.wins_per_player.values())
+
+
+if __name__ == '__main__':
+    print(f"Losing practice score multiplied by rolls:  {solve_part_1()}")
+    print(f"Universes won by the player who wins in more universes:  {solve_part_2()}")
@@ -3,10 +3,13 @@
 from __future__ import annotations
 from pathlib import Path
 import re
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+from puzzle_input import iter_lines
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
 class Cube:
@@ -91,28 +94,37 @@ class Reactor:
         self.on_regions = new_on_regions
 
 
-if __name__ == '__main__':
-    reboot_steps: list[RebootStep] = []
-
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        for line in file:
-            if match := re.match(r'(on|off) *x=([-\d]+)\.\.([-\d]+),y=([-\d]+)\.\.([-\d]+),z=([-\d]+)\.\.([-\d]+)', line):
-                on = match[1] == 'on'
-                region = Cube((int(match[2]), int(match[3])), (int(match[4]), int(match[5])), (int(match[6]), int(match[7])))
-                reboot_steps.append(RebootStep(on, region))
-
+def reboot_reactor(reboot_steps: Iterable[RebootStep]) -> Reactor:
     reactor = Reactor()
     for step in reboot_steps:
         reactor.do_reboot_step(step)
+    return reactor
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> Iterator[RebootStep]:
+    for line in iter_lines(input_file_path):
+        if match := re.match(r'(on|off) *x=([-\d]+)\.\.([-\d]+),y=([-\d]+)\.\.([-\d]+),z=([-\d]+)\.\.([-\d]+)', line):
+            on = match[1] == 'on'
+            region = Cube((int(match[2]), int(match[3])), (int(match[4]), int(match[5])), (int(match[6]), int(match[7])))
+            yield RebootStep(on, region)
 
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    reactor = reboot_reactor(parse_input(input_file_path))
     initialization_region = Cube((-50, 50), (-50, 50), (-50, 50))
     initialization_on_regions = [
         initialization_on_region
         for initialization_on_region in (on_region.intersection(initialization_region) for on_region in reactor.on_regions)
         if initialization_on_region
     ]
-    initialization_on_volume = sum(region.volume for region in initialization_on_regions)
-    print(f"Cubes on in initialization region:  {initialization_on_volume}")
+    return sum(region.volume for region in initialization_on_regions)
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    reactor = reboot_reactor(parse_input(input_file_path))
+    return sum(region.volume for region in reactor.on_regions)
 
-    on_volume = sum(region.volume for region in reactor.on_regions)
-    print(f"Total cubes on:  {on_volume}")
+
+if __name__ == '__main__':
+    print(f"Cubes on in initialization region:  {solve_part_1()}")
+    print(f"Total cubes on:  {solve_part_2()}")
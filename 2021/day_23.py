@@ -5,8 +5,11 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Optional, Tuple
 
+import events
+
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 STEP_ENERGY = {
     'A': 1,
@@ -169,7 +172,7 @@ def organize_amphipods(diagram: Diagram, organized_diagram: Diagram) -> list[Mov
 
         least_energy_moves_to_state[new_diagram] = move
         if new_diagram == organized_diagram:
-            print(f"Found solution that uses {move.total_energy_used} energy.")
+            events.emit(events.DETAIL, "Found solution that uses {total_energy_used} energy.", total_energy_used=move.total_energy_used)
 
         for next_move in find_amphipod_moves(move, room_spaces):
             if next_move.diagram in moves_to_explore and next_move.total_energy_used >= moves_to_explore[next_move.diagram].total_energy_used:
@@ -179,11 +182,19 @@ def organize_amphipods(diagram: Diagram, organized_diagram: Diagram) -> list[Mov
 
         explored_move_count += 1
         if explored_move_count % 100000 == 0:
-            print(f"Explored {explored_move_count} moves.")
+            events.emit(events.PROGRESS, "Explored {explored_move_count} moves.", explored_move_count=explored_move_count)
 
-    print(f"Explored {explored_move_count} moves.")
-    print(f"Ignored {ignored_local_suboptimal_move_count} locally suboptimal moves.")
-    print(f"Ignored {ignored_global_suboptimal_move_count} globally suboptimal moves.")
+    events.emit(events.PROGRESS, "Explored {explored_move_count} moves.", explored_move_count=explored_move_count)
+    events.emit(
+        events.PROGRESS,
+        "Ignored {ignored_local_suboptimal_move_count} locally suboptimal moves.",
+        ignored_local_suboptimal_move_count=ignored_local_suboptimal_move_count
+    )
+    events.emit(
+        events.PROGRESS,
+        "Ignored {ignored_global_suboptimal_move_count} globally suboptimal moves.",
+        ignored_global_suboptimal_move_count=ignored_global_suboptimal_move_count
+    )
 
     move_traceback = []
     move = least_energy_moves_to_state[organized_diagram]
@@ -193,20 +204,8 @@ def organize_amphipods(diagram: Diagram, organized_diagram: Diagram) -> list[Mov
     return list(reversed(move_traceback))
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        folded_diagram = tuple(line.rstrip() for line in file if line.rstrip())
-        print("Folded diagram:")
-        print("\n".join(folded_diagram))
-
-    folded_diagram_moves = organize_amphipods(folded_diagram, ORGANIZED_FOLDED_DIAGRAM)
-    print(f"Least energy solution for folded diagram has {len(folded_diagram_moves)} moves.")
-    for move in folded_diagram_moves:
-        print("\n".join(move.diagram))
-        print(f"Energy used:  {move.energy_used}")
-    print(f"Total energy used for folded diagram:  {folded_diagram_moves[-1].total_energy_used}")
-
-    unfolded_diagram = (
+def unfold_diagram(folded_diagram: Diagram) -> Diagram:
+    return (
         folded_diagram[:3]
         + (
             '  #D#C#B#A#',
@@ -214,12 +213,25 @@ if __name__ == '__main__':
         )
         + folded_diagram[3:]
     )
-    print("Unfolded diagram:")
-    print("\n".join(unfolded_diagram))
-
-    unfolded_diagram_moves = organize_amphipods(unfolded_diagram, ORGANIZED_UNFOLDED_DIAGRAM)
-    print(f"Least energy solution for unfolded diagram has {len(unfolded_diagram_moves)} moves.")
-    for move in unfolded_diagram_moves:
-        print("\n".join(move.diagram))
-        print(f"Energy used:  {move.energy_used}")
-    print(f"Total energy used for unfolded diagram:  {unfolded_diagram_moves[-1].total_energy_used}")
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> Diagram:
+    with open(input_file_path) as file:
+        return tuple(line.rstrip() for line in file if line.rstrip())
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    folded_diagram_moves = organize_amphipods(parse_input(input_file_path), ORGANIZED_FOLDED_DIAGRAM)
+    return folded_diagram_moves[-1].total_energy_used
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    unfolded_diagram_moves = organize_amphipods(unfold_diagram(parse_input(input_file_path)), ORGANIZED_UNFOLDED_DIAGRAM)
+    return unfolded_diagram_moves[-1].total_energy_used
+
+
+if __name__ == '__main__':
+    events.add_event_handler(events.print_event, events.PROGRESS)
+
+    print(f"Total energy used for folded diagram:  {solve_part_1()}")
+    print(f"Total energy used for unfolded diagram:  {solve_part_2()}")
@@ -1,10 +1,14 @@
 #!/usr/bin/env python
 
+from __future__ import annotations
 from pathlib import Path
 from typing import Optional
 
+import events
+
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
 class Instruction:
@@ -15,6 +19,14 @@ class Instruction:
         if b and b not in ('w', 'x', 'y', 'z'):
             self.b = int(b)
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Instruction):
+            return NotImplemented
+        return (self.name, self.a, self.b) == (other.name, other.a, other.b)
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.a, self.b))
+
 
 class ALU:
     def __init__(self, vars: Optional[dict[str, int]] = None) -> None:
@@ -44,10 +56,7 @@ class ALU:
                     vars[instruction.a] = int(vars[instruction.a] == b)
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        instructions = [Instruction(*line.split()) for line in file if line.rstrip()]
-
+def find_min_max_model_numbers(instructions: tuple[Instruction, ...]) -> tuple[int, int]:
     input_instruction_sets: list[list[Instruction]] = []
     for instruction in instructions:
         if instruction.name == 'inp':
@@ -79,9 +88,37 @@ if __name__ == '__main__':
                     if new_max_model_number > existing_min_max_model_numbers[1]:
                         existing_min_max_model_numbers[1] = new_max_model_number
         min_max_model_numbers_per_z_value = new_min_max_model_numbers_per_z_value
-        print(
-            f"Possible z values after input {input_number}:  {len(min_max_model_numbers_per_z_value)}"
-            f"  (min {min(min_max_model_numbers_per_z_value)}, max {max(min_max_model_numbers_per_z_value)})"
-        )
-    print(f"Min model number:  {min_max_model_numbers_per_z_value[0][0]}")
-    print(f"Max model number:  {min_max_model_numbers_per_z_value[0][1]}")
+        if events.is_enabled(events.PROGRESS):
+            events.emit(
+                events.PROGRESS,
+                "Possible z values after input {input_number}:  {z_value_count}  (min {min_z_value}, max {max_z_value})",
+                input_number=input_number,
+                z_value_count=len(min_max_model_numbers_per_z_value),
+                min_z_value=min(min_max_model_numbers_per_z_value),
+                max_z_value=max(min_max_model_numbers_per_z_value)
+            )
+    return tuple(min_max_model_numbers_per_z_value[0])
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> tuple[Instruction, ...]:
+    with open(input_file_path) as file:
+        return tuple(Instruction(*line.split()) for line in file if line.rstrip())
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    _, max_model_number = find_min_max_model_numbers(parse_input(input_file_path))
+    return max_model_number
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    min_model_number, _ = find_min_max_model_numbers(parse_input(input_file_path))
+    return min_model_number
+
+
+if __name__ == '__main__':
+    events.add_event_handler(events.print_event, events.PROGRESS)
+
+    # Both answers come from the same search, so it's only done once here.
+    min_model_number, max_model_number = find_min_max_model_numbers(parse_input())
+    print(f"Max model number:  {max_model_number}")
+    print(f"Min model number:  {min_model_number}")
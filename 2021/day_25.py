@@ -4,6 +4,7 @@ from pathlib import Path
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
 def move_east(sea_cucumbers: tuple[str]) -> tuple[str]:
@@ -30,10 +31,7 @@ def move_south(sea_cucumbers: tuple[str]) -> tuple[str]:
     )
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        sea_cucumbers = tuple(line.rstrip() for line in file if line.rstrip())
-
+def find_stopped_step(sea_cucumbers: tuple[str]) -> int:
     step = 0
     previous_sea_cucumbers = None
     while sea_cucumbers != previous_sea_cucumbers:
@@ -41,5 +39,17 @@ if __name__ == '__main__':
         previous_sea_cucumbers = sea_cucumbers
         sea_cucumbers = move_east(sea_cucumbers)
         sea_cucumbers = move_south(sea_cucumbers)
-    print('\n'.join(sea_cucumbers))
-    print(f"Sea cucumbers stopped moving after step {step}.")
+    return step
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> tuple[str]:
+    with open(input_file_path) as file:
+        return tuple(line.rstrip() for line in file if line.rstrip())
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return find_stopped_step(parse_input(input_file_path))
+
+
+if __name__ == '__main__':
+    print(f"Sea cucumbers stopped moving after step {solve_part_1()}.")
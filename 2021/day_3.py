@@ -1,75 +1,132 @@
 #!/usr/bin/env python
 
-from collections import defaultdict
+from array import array
 from pathlib import Path
+from typing import Iterable
+
+import events
+from puzzle_input import iter_lines
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+
+class DiagnosticTrie:
+    def __init__(self, bit_width: int) -> None:
+        self.bit_width = bit_width
+        # Nodes are indexes into flat arrays rather than objects.  Node 0 is the root, which is never anyone's child,
+        # so a child index of 0 means there is no such child.
+        self.child_nodes = (array('l', [0]), array('l', [0]))
+        self.subtree_counts = array('l', [0])
+        # How many numbers have a 1 at each bit index, counting from the most significant bit.
+        self.one_bit_counts = [0] * bit_width
+
+    def __len__(self) -> int:
+        return self.subtree_counts[0]
+
+    def add(self, number: int) -> None:
+        node = 0
+        self.subtree_counts[0] += 1
+        for bit_index in range(self.bit_width):
+            bit = (number >> (self.bit_width - bit_index - 1)) & 1
+            self.one_bit_counts[bit_index] += bit
+            child_nodes = self.child_nodes[bit]
+            child_node = child_nodes[node]
+            if not child_node:
+                child_node = len(self.subtree_counts)
+                child_nodes[node] = child_node
+                self.child_nodes[0].append(0)
+                self.child_nodes[1].append(0)
+                self.subtree_counts.append(0)
+            self.subtree_counts[child_node] += 1
+            node = child_node
+
+    def find_rating(self, keep_most_common: bool) -> int:
+        if not len(self):
+            raise Exception("Can't find a rating without any diagnostic numbers.")
+
+        node = 0
+        rating = 0
+        for _ in range(self.bit_width):
+            zero_child_node = self.child_nodes[0][node]
+            one_child_node = self.child_nodes[1][node]
+            zeros_count = self.subtree_counts[zero_child_node] if zero_child_node else 0
+            ones_count = self.subtree_counts[one_child_node] if one_child_node else 0
+            if not zeros_count:
+                bit = 1
+            elif not ones_count:
+                bit = 0
+            elif keep_most_common:
+                bit = 1 if ones_count >= zeros_count else 0
+            else:
+                bit = 0 if zeros_count <= ones_count else 1
+            rating = (rating << 1) | bit
+            node = one_child_node if bit else zero_child_node
+        return rating
+
+
+def build_diagnostic_trie(binary_numbers: Iterable[str]) -> DiagnosticTrie:
+    diagnostic_trie = None
+    for binary_number in binary_numbers:
+        if diagnostic_trie is None:
+            diagnostic_trie = DiagnosticTrie(len(binary_number))
+        diagnostic_trie.add(int(binary_number, 2))
+    if diagnostic_trie is None:
+        raise Exception("The diagnostic report is empty.")
+    return diagnostic_trie
+
+
+def diagnose_power_consumption(diagnostic_trie: DiagnosticTrie) -> int:
+    numbers_count = len(diagnostic_trie)
+    gamma_rate = 0
+    epsilon_rate = 0
+    for one_bit_count in diagnostic_trie.one_bit_counts:
+        zero_bit_count = numbers_count - one_bit_count
+        gamma_rate   = (gamma_rate << 1)   | (0 if zero_bit_count > one_bit_count else 1)
+        epsilon_rate = (epsilon_rate << 1) | (0 if zero_bit_count < one_bit_count else 1)
+
+    bit_width = diagnostic_trie.bit_width
+    events.emit(events.DETAIL, "Gamma rate:  {gamma_rate} ({gamma_rate:0{bit_width}b})", gamma_rate=gamma_rate, bit_width=bit_width)
+    events.emit(events.DETAIL, "Epsilon rate:  {epsilon_rate} ({epsilon_rate:0{bit_width}b})", epsilon_rate=epsilon_rate, bit_width=bit_width)
 
+    return gamma_rate * epsilon_rate
 
-def diagnose_power_consumption(binary_numbers: list[str]) -> int:
-    bit_counts = [defaultdict(int) for _ in range(len(binary_numbers[0]))]
 
-    for binary_number in binary_numbers:
-        for index, bit in enumerate(binary_number):
-            bit_counts[index][bit] += 1
+def diagnose_life_support_rating(diagnostic_trie: DiagnosticTrie) -> int:
+    bit_width = diagnostic_trie.bit_width
 
-    gamma_rate_binary = ''
-    epsilon_rate_binary = ''
-    for bit_count in bit_counts:
-        gamma_rate_binary   += '0' if bit_count['0'] > bit_count['1'] else '1'
-        epsilon_rate_binary += '0' if bit_count['0'] < bit_count['1'] else '1'
+    oxygen_generator_rating = diagnostic_trie.find_rating(keep_most_common=True)
+    events.emit(
+        events.DETAIL,
+        "Oxygen generator rating:  {oxygen_generator_rating} ({oxygen_generator_rating:0{bit_width}b})",
+        oxygen_generator_rating=oxygen_generator_rating,
+        bit_width=bit_width
+    )
 
-    gamma_rate = int(gamma_rate_binary, 2)
-    print(f"Gamma rate:  {gamma_rate} ({gamma_rate_binary})")
+    co2_scrubber_rating = diagnostic_trie.find_rating(keep_most_common=False)
+    events.emit(
+        events.DETAIL,
+        "CO2 scrubber rating:  {co2_scrubber_rating} ({co2_scrubber_rating:0{bit_width}b})",
+        co2_scrubber_rating=co2_scrubber_rating,
+        bit_width=bit_width
+    )
 
-    epsilon_rate = int(epsilon_rate_binary, 2)
-    print(f"Epsilon rate:  {epsilon_rate} ({epsilon_rate_binary})")
+    return oxygen_generator_rating * co2_scrubber_rating
 
-    return gamma_rate * epsilon_rate
 
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> DiagnosticTrie:
+    return build_diagnostic_trie(iter_lines(input_file_path))
 
-def partition_by_bit(bit_index: int, binary_numbers: list[str]) -> dict[str, list[str]]:
-    partitions = defaultdict(list)
-    for binary_number in binary_numbers:
-        partitions[binary_number[bit_index]].append(binary_number)
-    return partitions
-
-
-def diagnose_life_support_rating(binary_numbers: list[str]) -> int:
-    possible_oxygen_generator_ratings = binary_numbers
-    for bit_index in range(len(possible_oxygen_generator_ratings[0])):
-        partitions = partition_by_bit(bit_index, possible_oxygen_generator_ratings)
-        possible_oxygen_generator_ratings = partitions['1'] if len(partitions['1']) >= len(partitions['0']) else partitions['0']
-        if len(possible_oxygen_generator_ratings) == 1:
-            oxygen_generator_rating_binary = possible_oxygen_generator_ratings[0]
-            oxygen_generator_rating = int(oxygen_generator_rating_binary, 2)
-            print(f"Oxygen generator rating:  {oxygen_generator_rating} ({oxygen_generator_rating_binary})")
-            break
-    else:
-        raise Exception("Didn't find an oxygen generator rating.")
-
-    possible_co2_scrubber_ratings = binary_numbers
-    for bit_index in range(len(possible_co2_scrubber_ratings[0])):
-        partitions = partition_by_bit(bit_index, possible_co2_scrubber_ratings)
-        possible_co2_scrubber_ratings = partitions['0'] if len(partitions['0']) <= len(partitions['1']) else partitions['1']
-        if len(possible_co2_scrubber_ratings) == 1:
-            co2_scrubber_rating_binary = possible_co2_scrubber_ratings[0]
-            co2_scrubber_rating = int(co2_scrubber_rating_binary, 2)
-            print(f"CO2 scrubber rating:  {co2_scrubber_rating} ({co2_scrubber_rating_binary})")
-            break
-    else:
-        raise Exception("Didn't find a CO2 scrubber rating.")
-    
-    return oxygen_generator_rating * co2_scrubber_rating
 
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return diagnose_power_consumption(parse_input(input_file_path))
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        binary_numbers = [line.rstrip() for line in file]
 
-    power_consumption = diagnose_power_consumption(binary_numbers)
-    print(f"Power consumption:  {power_consumption}")
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return diagnose_life_support_rating(parse_input(input_file_path))
 
-    life_support_rating = diagnose_life_support_rating(binary_numbers)
-    print(f"Life support rating:  {life_support_rating}")
+
+if __name__ == '__main__':
+    print(f"Power consumption:  {solve_part_1()}")
+    print(f"Life support rating:  {solve_part_2()}")
@@ -1,63 +1,110 @@
 #!/usr/bin/env python
 
+from array import array
+from collections import defaultdict
 from pathlib import Path
+from typing import Optional
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 
-class BingoNumber:
-    def __init__(self, value: int) -> None:
-        self.value = value
-        self.is_marked = False
+class BingoGame:
+    def __init__(self, numbers_to_be_drawn: list[int], board_size: int = 5) -> None:
+        self.numbers_to_be_drawn = numbers_to_be_drawn
+        self.board_size = board_size
+        self.board_count = 0
+        # Which (board index, row, column) cells each number is in, so a draw only touches the cells it marks.
+        self.cells_per_number: dict[int, list[tuple[int, int, int]]] = defaultdict(list)
+        # Hit counts are indexed by (board index * board size) + row or column.
+        self.row_hit_counts = array('l')
+        self.column_hit_counts = array('l')
+        self.unmarked_sums = array('q')
+        self.has_won = bytearray()
+        self.drawn_numbers: set[int] = set()
+        self.draw_count = 0
+        # Board numbers (starting at 1) and their winning scores, in the order they won.
+        self.winning_board_scores: list[tuple[int, int]] = []
 
+    def add_board(self, rows: list[list[int]]) -> None:
+        board_index = self.board_count
+        self.board_count += 1
+        for row_index, row in enumerate(rows):
+            for column_index, number in enumerate(row):
+                self.cells_per_number[number].append((board_index, row_index, column_index))
+        self.row_hit_counts.extend([0] * self.board_size)
+        self.column_hit_counts.extend([0] * self.board_size)
+        self.unmarked_sums.append(sum(number for row in rows for number in row))
+        self.has_won.append(False)
 
-class BingoBoard:
-    def __init__(self, id: int) -> None:
-        self.id = id
-        self.rows: list[list[BingoNumber]] = []
-    
-    def add_row(self, row: list[BingoNumber]) -> None:
-        self.rows.append(row)
+    def draw(self) -> bool:
+        if self.draw_count >= len(self.numbers_to_be_drawn):
+            return False
+        number = self.numbers_to_be_drawn[self.draw_count]
+        self.draw_count += 1
+        if number in self.drawn_numbers:
+            return True
+        self.drawn_numbers.add(number)
 
-    def has_won(self) -> bool:
-        return (
-            any(all(number.is_marked for number in row) for row in self.rows)
-            or any(all(row[column].is_marked for row in self.rows) for column in range(len(self.rows[0])))
-        )
-    
-    def sum_unmarked_numbers(self) -> int:
-        return sum(number.value for row in self.rows for number in row if not number.is_marked)
+        board_size = self.board_size
+        for board_index, row_index, column_index in self.cells_per_number.get(number, ()):
+            if self.has_won[board_index]:
+                continue
+            self.unmarked_sums[board_index] -= number
+            row_hits_index = (board_index * board_size) + row_index
+            column_hits_index = (board_index * board_size) + column_index
+            self.row_hit_counts[row_hits_index] += 1
+            self.column_hit_counts[column_hits_index] += 1
+            if self.row_hit_counts[row_hits_index] == board_size or self.column_hit_counts[column_hits_index] == board_size:
+                self.has_won[board_index] = True
+                self.winning_board_scores.append((board_index + 1, self.unmarked_sums[board_index] * number))
+        return True
 
+    def first_winner(self) -> Optional[tuple[int, int]]:
+        while not self.winning_board_scores and self.draw():
+            pass
+        return self.winning_board_scores[0] if self.winning_board_scores else None
+
+    def last_winner(self) -> Optional[tuple[int, int]]:
+        while len(self.winning_board_scores) < self.board_count and self.draw():
+            pass
+        return self.winning_board_scores[-1] if self.winning_board_scores else None
+
+    def win_order(self) -> list[tuple[int, int]]:
+        self.last_winner()
+        return self.winning_board_scores
 
-if __name__ == '__main__':
-    numbers = {number: BingoNumber(number) for number in range(100)}
-    boards: list[BingoBoard] = []
 
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        numbers_to_be_drawn = [numbers[int(number_str)] for number_str in file.readline().rstrip().split(',')]
-        print(f"Numbers to be drawn:  {len(numbers_to_be_drawn)}")
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> BingoGame:
+    with open(input_file_path) as file:
+        numbers_to_be_drawn = [int(number_str) for number_str in file.readline().rstrip().split(',')]
+        game = BingoGame(numbers_to_be_drawn)
 
-        new_board = None
+        board_rows: list[list[int]] = []
         for line in file:
-            new_row = [numbers[int(number_str)] for number_str in line.split()]
+            new_row = [int(number_str) for number_str in line.split()]
             if new_row:
-                if not new_board:
-                    new_board = BingoBoard(len(boards) + 1)
-                    boards.append(new_board)
-                new_board.add_row(new_row)
-            else:
-                new_board = None
-        print(f"Boards:  {len(boards)}")
-    
-    winning_boards: set[BingoBoard] = set()
-    for number in numbers_to_be_drawn:
-        number.is_marked = True
-        for board in boards:
-            if board.has_won() and board not in winning_boards:
-                winning_boards.add(board)
-                winning_score = board.sum_unmarked_numbers() * number.value
-                if len(winning_boards) == 1:
-                    print(f"Board {board.id} won first with score {winning_score}.")
-                elif len(winning_boards) == len(boards):
-                    print(f"Board {board.id} won last with score {winning_score}.")
+                board_rows.append(new_row)
+            elif board_rows:
+                game.add_board(board_rows)
+                board_rows = []
+        if board_rows:
+            game.add_board(board_rows)
+
+    return game
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    _, winning_score = parse_input(input_file_path).first_winner()
+    return winning_score
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    _, winning_score = parse_input(input_file_path).last_winner()
+    return winning_score
+
+
+if __name__ == '__main__':
+    print(f"First winning board score:  {solve_part_1()}")
+    print(f"Last winning board score:  {solve_part_2()}")
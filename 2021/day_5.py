@@ -1,10 +1,25 @@
 #!/usr/bin/env python
 
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
 from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from puzzle_input import iter_lines
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+HORIZONTAL, VERTICAL, DIAGONAL, ANTI_DIAGONAL = range(4)
+# Every point on a line in each direction has the same value of (a * x) + (b * y) for these (a, b).
+LINE_INVARIANTS = ((0, 1), (1, 0), (1, -1), (1, 1))
+
+# Grids bigger than this are counted from the line segments instead.
+MAX_DENSE_GRID_CELLS = 64 * 1024 * 1024
+
+# Adds a vent to every count in a slice of the grid, saturating at 255 so counts still fit in a byte.
+ADD_VENT = bytes(min(vent_count + 1, 255) for vent_count in range(256))
 
 
 class Point:
@@ -18,63 +33,220 @@ class Line:
         self.start_point = start_point
         self.end_point = end_point
 
-    def get_covered_points(self) -> list[Point]:
-        x_increment = 0
-        if self.end_point.x != self.start_point.x:
-            x_increment = 1 if self.end_point.x > self.start_point.x else -1
+    @property
+    def direction(self) -> int:
+        x_distance = self.end_point.x - self.start_point.x
+        y_distance = self.end_point.y - self.start_point.y
+        if not y_distance:
+            return HORIZONTAL
+        if not x_distance:
+            return VERTICAL
+        if x_distance == y_distance:
+            return DIAGONAL
+        if x_distance == -y_distance:
+            return ANTI_DIAGONAL
+        raise Exception(f"Vent lines must be horizontal, vertical or diagonal:  {self}")
+
+    def is_horizontal_or_vertical(self) -> bool:
+        return self.end_point.x == self.start_point.x or self.end_point.y == self.start_point.y
+
+    def __str__(self) -> str:
+        return f"{self.start_point.x},{self.start_point.y} -> {self.end_point.x},{self.end_point.y}"
 
-        y_increment = 0
-        if self.end_point.y != self.start_point.y:
-            y_increment = 1 if self.end_point.y > self.start_point.y else -1
 
-        total_increments = max(abs(self.end_point.x - self.start_point.x), abs(self.end_point.y - self.start_point.y))
-        return [
-            Point(
-                (self.start_point.x + (x_increment * increment_number)),
-                (self.start_point.y + (y_increment * increment_number))
-            )
-            for increment_number in range(total_increments + 1)
-        ]
+def point_on_line(direction: int, invariant: int, position: int) -> tuple[int, int]:
+    # Positions along a line are y coordinates for vertical lines, and x coordinates for every other direction.
+    if direction == HORIZONTAL:
+        return position, invariant
+    if direction == VERTICAL:
+        return invariant, position
+    if direction == DIAGONAL:
+        return position, position - invariant
+    return position, invariant - position
 
 
-def count_vents_per_point(vent_lines: list[Line]) -> dict[int, dict[int, int]]:
-    points = defaultdict(lambda: defaultdict(int))
+def position_on_line(direction: int, x: int, y: int) -> int:
+    return y if direction == VERTICAL else x
+
+
+def line_invariant(direction: int, x: int, y: int) -> int:
+    a, b = LINE_INVARIANTS[direction]
+    return (a * x) + (b * y)
+
+
+def count_multiple_vent_points_in_grid(vent_lines: Sequence[Line]) -> int:
+    min_x = min(min(line.start_point.x, line.end_point.x) for line in vent_lines)
+    min_y = min(min(line.start_point.y, line.end_point.y) for line in vent_lines)
+    width  = max(max(line.start_point.x, line.end_point.x) for line in vent_lines) - min_x + 1
+    height = max(max(line.start_point.y, line.end_point.y) for line in vent_lines) - min_y + 1
+    vent_counts = bytearray(width * height)
+
+    for line in vent_lines:
+        # Every line covers evenly spaced cells of the flattened grid, so it's a single strided slice.
+        start_index = ((line.start_point.y - min_y) * width) + line.start_point.x - min_x
+        end_index   = ((line.end_point.y - min_y) * width) + line.end_point.x - min_x
+        direction = line.direction
+        step = (1, width, width + 1, width - 1)[direction]
+        covered_cells = slice(min(start_index, end_index), max(start_index, end_index) + 1, step)
+        vent_counts[covered_cells] = vent_counts[covered_cells].translate(ADD_VENT)
+
+    return len(vent_counts) - vent_counts.count(0) - vent_counts.count(1)
+
+
+def sweep_intervals(intervals: Iterable[tuple[int, int]]) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    # Returns the intervals covered at least once and at least twice, both sorted and merged.
+    changes = []
+    for start, end in intervals:
+        changes.append((start, 1))
+        changes.append((end + 1, -1))
+    changes.sort()
+
+    covered_intervals = []
+    overlapped_intervals = []
+    coverage = 0
+    for position, change in changes:
+        if coverage == 0 and change > 0:
+            covered_start = position
+        elif coverage == 1 and change > 0:
+            overlapped_start = position
+        elif coverage == 2 and change < 0 and position > overlapped_start:
+            overlapped_intervals.append((overlapped_start, position - 1))
+        coverage += change
+        if coverage == 0 and position > covered_start:
+            covered_intervals.append((covered_start, position - 1))
+    return merge_intervals(covered_intervals), merge_intervals(overlapped_intervals)
+
+
+def merge_intervals(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged_intervals: list[tuple[int, int]] = []
+    for start, end in intervals:
+        if merged_intervals and start <= merged_intervals[-1][1] + 1:
+            merged_intervals[-1] = (merged_intervals[-1][0], max(end, merged_intervals[-1][1]))
+        else:
+            merged_intervals.append((start, end))
+    return merged_intervals
+
+
+def is_in_intervals(position: int, intervals: list[tuple[int, int]]) -> bool:
+    interval_index = bisect_right(intervals, (position, float('inf'))) - 1
+    return interval_index >= 0 and intervals[interval_index][1] >= position
+
+
+def find_crossing_points(
+    covered_intervals: list[dict[int, list[tuple[int, int]]]],
+    direction: int,
+    crossing_direction: int
+) -> Iterator[tuple[int, int]]:
+    # Sweeps across the invariants of the crossing direction, keeping the invariants of the lines that span the sweep.
+    events = []
+    for invariant, intervals in covered_intervals[direction].items():
+        for start, end in intervals:
+            crossing_invariants = sorted((
+                line_invariant(crossing_direction, *point_on_line(direction, invariant, start)),
+                line_invariant(crossing_direction, *point_on_line(direction, invariant, end))
+            ))
+            events.append((crossing_invariants[0], 0, invariant, invariant))
+            events.append((crossing_invariants[1], 2, invariant, invariant))
+    for crossing_invariant, intervals in covered_intervals[crossing_direction].items():
+        for start, end in intervals:
+            invariants = sorted((
+                line_invariant(direction, *point_on_line(crossing_direction, crossing_invariant, start)),
+                line_invariant(direction, *point_on_line(crossing_direction, crossing_invariant, end))
+            ))
+            events.append((crossing_invariant, 1, invariants[0], invariants[1]))
+    events.sort()
+
+    a, b = LINE_INVARIANTS[direction]
+    crossing_a, crossing_b = LINE_INVARIANTS[crossing_direction]
+    determinant = (a * crossing_b) - (crossing_a * b)
+    active_invariants: list[int] = []
+    for crossing_invariant, event_type, first_invariant, last_invariant in events:
+        if event_type == 0:
+            insort(active_invariants, first_invariant)
+        elif event_type == 2:
+            del active_invariants[bisect_left(active_invariants, first_invariant)]
+        else:
+            first_index = bisect_left(active_invariants, first_invariant)
+            last_index = bisect_right(active_invariants, last_invariant)
+            for invariant in active_invariants[first_index:last_index]:
+                # Diagonal lines only cross at a whole point when their invariants have the same parity.
+                x, x_remainder = divmod((invariant * crossing_b) - (crossing_invariant * b), determinant)
+                y, y_remainder = divmod((a * crossing_invariant) - (crossing_a * invariant), determinant)
+                if not x_remainder and not y_remainder:
+                    yield x, y
+
+
+def count_multiple_vent_points_from_segments(vent_lines: Iterable[Line]) -> int:
+    line_intervals: list[dict[int, list[tuple[int, int]]]] = [defaultdict(list) for _ in LINE_INVARIANTS]
     for line in vent_lines:
-        for point in line.get_covered_points():
-            points[point.y][point.x] += 1
-    return points
+        direction = line.direction
+        invariant = line_invariant(direction, line.start_point.x, line.start_point.y)
+        positions = sorted((
+            position_on_line(direction, line.start_point.x, line.start_point.y),
+            position_on_line(direction, line.end_point.x, line.end_point.y)
+        ))
+        line_intervals[direction][invariant].append((positions[0], positions[1]))
+
+    covered_intervals: list[dict[int, list[tuple[int, int]]]] = [{} for _ in LINE_INVARIANTS]
+    overlapped_intervals: list[dict[int, list[tuple[int, int]]]] = [{} for _ in LINE_INVARIANTS]
+    multiple_vent_points = 0
+    for direction, intervals_per_invariant in enumerate(line_intervals):
+        for invariant, intervals in intervals_per_invariant.items():
+            covered, overlapped = sweep_intervals(intervals)
+            covered_intervals[direction][invariant] = covered
+            if overlapped:
+                overlapped_intervals[direction][invariant] = overlapped
+                multiple_vent_points += sum(end - start + 1 for start, end in overlapped)
+
+    # Points where lines in different directions cross have at least two vents.  Those already counted as overlaps
+    # along one line are skipped, and those counted along several lines are only counted once.
+    crossing_points = {
+        point
+        for direction in range(len(LINE_INVARIANTS))
+        for crossing_direction in range(direction + 1, len(LINE_INVARIANTS))
+        for point in find_crossing_points(covered_intervals, direction, crossing_direction)
+    }
+    for x, y in crossing_points:
+        overlapping_directions = 0
+        for direction in range(len(LINE_INVARIANTS)):
+            overlapped = overlapped_intervals[direction].get(line_invariant(direction, x, y))
+            if overlapped and is_in_intervals(position_on_line(direction, x, y), overlapped):
+                overlapping_directions += 1
+        multiple_vent_points += 1 - overlapping_directions
+
+    return multiple_vent_points
+
+
+def count_multiple_vent_points(vent_lines: Iterable[Line], max_dense_grid_cells: int = MAX_DENSE_GRID_CELLS) -> int:
+    vent_lines = list(vent_lines)
+    if not vent_lines:
+        return 0
+
+    width  = max(max(line.start_point.x, line.end_point.x) for line in vent_lines) - min(min(line.start_point.x, line.end_point.x) for line in vent_lines) + 1
+    height = max(max(line.start_point.y, line.end_point.y) for line in vent_lines) - min(min(line.start_point.y, line.end_point.y) for line in vent_lines) + 1
+    if width * height <= max_dense_grid_cells:
+        return count_multiple_vent_points_in_grid(vent_lines)
+    return count_multiple_vent_points_from_segments(vent_lines)
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> Iterator[Line]:
+    for line in iter_lines(input_file_path):
+        line_parts = line.split()
+        if line_parts and len(line_parts) == 3:
+            start_point = Point(*(int(number_str) for number_str in line_parts[0].split(',')))
+            end_point   = Point(*(int(number_str) for number_str in line_parts[2].split(',')))
+            yield Line(start_point, end_point)
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    horizontal_vertical_vent_lines = (line for line in parse_input(input_file_path) if line.is_horizontal_or_vertical())
+    return count_multiple_vent_points(horizontal_vertical_vent_lines)
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return count_multiple_vent_points(parse_input(input_file_path))
 
 
 if __name__ == '__main__':
-    vent_lines: list[Line] = []
-
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        for line in file:
-            line_parts = line.rstrip().split()
-            if line_parts and len(line_parts) == 3:
-                start_point = Point(*(int(number_str) for number_str in line_parts[0].split(',')))
-                end_point   = Point(*(int(number_str) for number_str in line_parts[2].split(',')))
-                vent_lines.append(Line(start_point, end_point))
-
-    horizontal_vertical_vent_lines = [
-        line
-        for line in vent_lines
-        if line.end_point.x == line.start_point.x or line.end_point.y == line.start_point.y
-    ]
-    horizontal_vertical_vents_per_point = count_vents_per_point(horizontal_vertical_vent_lines)
-    multiple_horizontal_vertical_vent_points_count = sum(
-        1
-        for row in horizontal_vertical_vents_per_point.values()
-        for vent_count in row.values()
-        if vent_count > 1
-    )
-    print(f"Points with at least two horizontal or vertical vents:  {multiple_horizontal_vertical_vent_points_count}")
-
-    vents_per_point = count_vents_per_point(vent_lines)
-    multiple_vent_points_count = sum(
-        1
-        for row in vents_per_point.values()
-        for vent_count in row.values()
-        if vent_count > 1
-    )
-    print(f"Points with at least two vents:  {multiple_vent_points_count}")
+    print(f"Points with at least two horizontal or vertical vents:  {solve_part_1()}")
+    print(f"Points with at least two vents:  {solve_part_2()}")
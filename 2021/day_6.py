@@ -1,28 +1,118 @@
 #!/usr/bin/env python
 
+from array import array
 import functools
 from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from matrices import Matrix, raise_matrix
+from puzzle_input import read_ints
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+# The timer a fish restarts at after reproducing, and the timer a newborn fish starts at.
+RESET_TIMER = 6
+NEW_FISH_TIMER = 8
+
+# Below this many days stepping day by day is faster than raising the growth matrix to a power.
+MATRIX_POWER_MIN_DAYS = 10000
+
+
+def check_timers(reset_timer: int, new_fish_timer: int) -> None:
+    if not 0 <= reset_timer <= new_fish_timer:
+        raise Exception(f"Invalid lanternfish timers:  reset to {reset_timer}, new fish at {new_fish_timer}")
+
+
+def step_timer_counts(timer_counts: Sequence[int], reset_timer: int = RESET_TIMER) -> list[int]:
+    # Newborn fish go to the last timer, so the new fish timer is the length of the counts.
+    reproducing_count = timer_counts[0]
+    next_timer_counts = list(timer_counts[1:])
+    next_timer_counts.append(reproducing_count)
+    next_timer_counts[reset_timer] += reproducing_count
+    return next_timer_counts
+
+
+def simulate_timer_counts(
+    timer_counts: Sequence[int],
+    days: int,
+    reset_timer: int = RESET_TIMER,
+    new_fish_timer: int = NEW_FISH_TIMER
+) -> list[int]:
+    check_timers(reset_timer, new_fish_timer)
+    timer_counts = list(timer_counts)
+    for _ in range(days):
+        timer_counts = step_timer_counts(timer_counts, reset_timer)
+    return timer_counts
+
+
+def build_growth_matrix(reset_timer: int = RESET_TIMER, new_fish_timer: int = NEW_FISH_TIMER) -> Matrix:
+    # Multiplying a vector of fish counts per timer by this matrix advances it by a day.
+    timer_count = new_fish_timer + 1
+    growth_matrix = [[0] * timer_count for _ in range(timer_count)]
+    for timer in range(1, timer_count):
+        growth_matrix[timer - 1][timer] = 1
+    growth_matrix[reset_timer][0] += 1
+    growth_matrix[new_fish_timer][0] += 1
+    return growth_matrix
+
+
+@functools.lru_cache(maxsize=32)
+def count_descendants_per_timer(
+    days: int,
+    reset_timer: int = RESET_TIMER,
+    new_fish_timer: int = NEW_FISH_TIMER,
+    by_matrix_power: Optional[bool] = None
+) -> tuple[int, ...]:
+    # How many fish a single fish with each timer value turns into, so any population costs a single dot product.
+    check_timers(reset_timer, new_fish_timer)
+    if by_matrix_power is None:
+        by_matrix_power = days >= MATRIX_POWER_MIN_DAYS
+
+    if by_matrix_power:
+        # Column sums of the growth matrix power, the fish counts a single fish of each timer value grows into.
+        return tuple(map(sum, zip(*raise_matrix(build_growth_matrix(reset_timer, new_fish_timer), days))))
+
+    # Stepping backwards:  a fish's descendants after n days are those of the fish it becomes after one day.
+    descendant_counts = [1] * (new_fish_timer + 1)
+    for _ in range(days):
+        descendant_counts = [descendant_counts[reset_timer] + descendant_counts[new_fish_timer]] + descendant_counts[:-1]
+    return tuple(descendant_counts)
+
+
+def count_population(
+    timers: Iterable[int],
+    days: int,
+    reset_timer: int = RESET_TIMER,
+    new_fish_timer: int = NEW_FISH_TIMER,
+    by_matrix_power: Optional[bool] = None
+) -> int:
+    timer_counts = [0] * (new_fish_timer + 1)
+    for timer in timers:
+        if not 0 <= timer <= new_fish_timer:
+            raise Exception(f"Invalid lanternfish timer:  {timer}")
+        timer_counts[timer] += 1
+    descendant_counts = count_descendants_per_timer(days, reset_timer, new_fish_timer, by_matrix_power)
+    return sum(map(int.__mul__, timer_counts, descendant_counts))
 
 
-@functools.lru_cache(maxsize=None)
 def simulate_population_growth(days_until_reproduction: int, simulate_days: int) -> int:
-    population = 1
-    while simulate_days > days_until_reproduction:
-        simulate_days -= days_until_reproduction + 1
-        population += simulate_population_growth(8, simulate_days)
-        days_until_reproduction = 6
-    return population
+    return count_descendants_per_timer(simulate_days)[days_until_reproduction]
 
 
-if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        fish = [int(number_str) for number_str in file.readline().rstrip().split(',')]
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> array:
+    return read_ints(input_file_path, separator=b',')
 
-    fish_after_80_days = sum(simulate_population_growth(days_until_reproduction, 80) for days_until_reproduction in fish)
-    print(f"Fish after 80 days:  {fish_after_80_days}")
 
-    fish_after_256_days = sum(simulate_population_growth(days_until_reproduction, 256) for days_until_reproduction in fish)
-    print(f"Fish after 256 days:  {fish_after_256_days}")
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return count_population(parse_input(input_file_path), 80)
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return count_population(parse_input(input_file_path), 256)
+
+
+if __name__ == '__main__':
+    print(f"Fish after 80 days:  {solve_part_1()}")
+    print(f"Fish after 256 days:  {solve_part_2()}")
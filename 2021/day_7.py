@@ -1,35 +1,101 @@
 #!/usr/bin/env python
 
+from array import array
+from bisect import bisect_right
+import itertools
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from puzzle_input import read_ints
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+
+class CrabPositions:
+    def __init__(self, positions: Iterable[int]) -> None:
+        self.positions = array('q', sorted(positions))
+        if not self.positions:
+            raise Exception("There are no crabs to align.")
+        # Prefix sums of the sorted positions give the total distance to any position with a single bisection.
+        self.prefix_sums = array('q', itertools.accumulate(self.positions, initial=0))
+        self.total_squares = sum(position * position for position in self.positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.positions)
+
+    def count_positions(self) -> list[tuple[int, int]]:
+        return [(position, len(list(group))) for position, group in itertools.groupby(self.positions)]
+
+    def total_distance(self, target_position: int) -> int:
+        crabs_before = bisect_right(self.positions, target_position)
+        distance_before = (target_position * crabs_before) - self.prefix_sums[crabs_before]
+        distance_after = (self.prefix_sums[-1] - self.prefix_sums[crabs_before]) - (target_position * (len(self) - crabs_before))
+        return distance_before + distance_after
+
+    def total_squared_distance(self, target_position: int) -> int:
+        return (len(self) * target_position * target_position) - (2 * target_position * self.prefix_sums[-1]) + self.total_squares
 
 
 def triangular_number(number: int) -> int:
     return (number * (number + 1)) // 2
 
 
+def find_optimal_position_for_linear_fuel(crabs: CrabPositions) -> tuple[int, int]:
+    # Any position between the two middle crabs is optimal, so the lower median is the first optimal position.
+    median_position = crabs.positions[(len(crabs) - 1) // 2]
+    return median_position, crabs.total_distance(median_position)
+
+
+def find_optimal_position_for_triangular_fuel(crabs: CrabPositions) -> tuple[int, int]:
+    # The fuel usage is half the total squared distance plus half the total distance, so the optimal position is
+    # within half a step of the mean.
+    def fuel_usage(position: int) -> int:
+        return (crabs.total_squared_distance(position) + crabs.total_distance(position)) // 2
+
+    mean_position_floor = crabs.prefix_sums[-1] // len(crabs)
+    candidate_positions = range(mean_position_floor - 1, mean_position_floor + 3)
+    optimal_position = min(candidate_positions, key=fuel_usage)
+    return optimal_position, fuel_usage(optimal_position)
+
+
+def find_optimal_position(crabs: CrabPositions, fuel_usage: Callable[[int], int]) -> tuple[int, int]:
+    # Works for any convex fuel usage:  the total only ever stops decreasing once, so the first position where it does
+    # is found by bisecting on the change in fuel usage.
+    counted_positions = crabs.count_positions()
+
+    def total_fuel_usage(target_position: int) -> int:
+        return sum(crab_count * fuel_usage(abs(target_position - position)) for position, crab_count in counted_positions)
+
+    low_position = crabs.positions[0]
+    high_position = crabs.positions[-1]
+    while low_position < high_position:
+        middle_position = (low_position + high_position) // 2
+        if total_fuel_usage(middle_position + 1) >= total_fuel_usage(middle_position):
+            high_position = middle_position
+        else:
+            low_position = middle_position + 1
+    return low_position, total_fuel_usage(low_position)
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> CrabPositions:
+    return CrabPositions(read_ints(input_file_path, separator=b','))
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    _, naive_optimal_fuel_usage = find_optimal_position_for_linear_fuel(parse_input(input_file_path))
+    return naive_optimal_fuel_usage
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    _, actual_optimal_fuel_usage = find_optimal_position_for_triangular_fuel(parse_input(input_file_path))
+    return actual_optimal_fuel_usage
+
+
 if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        crabs = [int(number_str) for number_str in file.readline().rstrip().split(',')]
-
-    possible_positions = list(range(max(crabs) + 1))
-
-    naive_fuel_usage_by_position = {
-        position: sum(abs(position - crab_position) for crab_position in crabs)
-        for position in possible_positions
-    }
-    naive_optimal_position = min(possible_positions, key=lambda position: naive_fuel_usage_by_position[position])
-    naive_optimal_fuel_usage = naive_fuel_usage_by_position[naive_optimal_position]
-    print(f"Naive optimal position:  {naive_optimal_position}")
-    print(f"Naive fuel usage:  {naive_optimal_fuel_usage}")
-
-    actual_fuel_usage_by_position = {
-        position: sum(triangular_number(abs(position - crab_position)) for crab_position in crabs)
-        for position in possible_positions
-    }
-    actual_optimal_position = min(possible_positions, key=lambda position: actual_fuel_usage_by_position[position])
-    actual_optimal_fuel_usage = actual_fuel_usage_by_position[actual_optimal_position]
-    print(f"Actual optimal position:  {actual_optimal_position}")
-    print(f"Actual fuel usage:  {actual_optimal_fuel_usage}")
+    print(f"Naive fuel usage:  {solve_part_1()}")
+    print(f"Actual fuel usage:  {solve_part_2()}")
@@ -1,9 +1,16 @@
 #!/usr/bin/env python
 
+import functools
+import itertools
 from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+
+from parallel import CHUNK_SIZE, map_chunks_in_parallel
+from puzzle_input import iter_lines
 
 
 FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
 
 '''
  aaaa
@@ -28,6 +35,17 @@ DIGIT_SIGNAL_PATTERNS = {
 }
 
 
+# Patterns are 7-bit masks, with a bit per signal.
+SIGNALS = 'abcdefg'
+SIGNAL_BITS = {signal: 1 << signal_index for signal_index, signal in enumerate(SIGNALS)}
+# How many signals each pattern mask has.
+SIGNAL_COUNTS = bytes(bin(pattern_mask).count('1') for pattern_mask in range(1 << len(SIGNALS)))
+
+
+def encode_pattern(pattern: str) -> int:
+    return sum(SIGNAL_BITS[signal] for signal in pattern)
+
+
 '''
 Segment frequencies (digits they appear in):
     a = 8  (0   2 3   5 6 7 8 9)
@@ -37,50 +55,70 @@ Segment frequencies (digits they appear in):
     e = 4  (0   2       6   8  )
     f = 9  (0 1   3 4 5 6 7 8 9)
     g = 7  (0   2 3   5 6   8 9)
+
+Frequencies don't depend on the wiring, and summing them over a digit's segments gives a different total for every
+digit, so that total identifies a digit however its signals are mixed up.
 '''
+def signal_frequency_total(pattern_mask: int, unique_pattern_masks: Sequence[int]) -> int:
+    return sum(SIGNAL_COUNTS[pattern_mask & unique_pattern_mask] for unique_pattern_mask in unique_pattern_masks)
+
+
+DIGIT_PATTERN_MASKS = [encode_pattern(pattern) for pattern in DIGIT_SIGNAL_PATTERNS]
+DIGITS_BY_FREQUENCY_TOTAL = {
+    signal_frequency_total(encode_pattern(pattern), DIGIT_PATTERN_MASKS): digit
+    for pattern, digit in DIGIT_SIGNAL_PATTERNS.items()
+}
+
+
+def decode_display_digits(unique_pattern_masks: Sequence[int], display_pattern_masks: Sequence[int]) -> list[int]:
+    try:
+        return [
+            DIGITS_BY_FREQUENCY_TOTAL[signal_frequency_total(display_pattern_mask, unique_pattern_masks)]
+            for display_pattern_mask in display_pattern_masks
+        ]
+    except KeyError:
+        raise Exception("The display patterns don't match the unique signal patterns.")
+
+
+def display_value(digits: Iterable[int]) -> int:
+    return functools.reduce(lambda value, digit: (value * 10) + digit, digits, 0)
+
+
 def decode_display(unique_signal_patterns: list[str], display_patterns: list[str]) -> int:
-    signal_corrections = {}
-    signal_frequencies = {signal: sum(1 for pattern in unique_signal_patterns if signal in pattern) for signal in 'abcdefg'}
-    for signal, frequency in signal_frequencies.items():
-        if frequency == 6:
-            signal_corrections[signal] = 'b'
-        elif frequency == 4:
-            signal_corrections[signal] = 'e'
-        elif frequency == 9:
-            signal_corrections[signal] = 'f'
-    one_pattern = [pattern for pattern in unique_signal_patterns if len(pattern) == 2][0]
-    for signal in one_pattern:
-        if signal not in signal_corrections:
-            signal_corrections[signal] = 'c'
-            break
-    seven_pattern = [pattern for pattern in unique_signal_patterns if len(pattern) == 3][0]
-    for signal in seven_pattern:
-        if signal not in one_pattern:
-            signal_corrections[signal] = 'a'
-            break
-    four_pattern = [pattern for pattern in unique_signal_patterns if len(pattern) == 4][0]
-    for signal in four_pattern:
-        if signal not in signal_corrections:
-            signal_corrections[signal] = 'd'
-            break
-    for signal in 'abcdefg':
-        if signal not in signal_corrections:
-            signal_corrections[signal] = 'g'
-            break
-    corrected_display_patterns = [''.join(sorted(signal_corrections[signal] for signal in pattern)) for pattern in display_patterns]
-    return int(''.join(str(DIGIT_SIGNAL_PATTERNS[pattern]) for pattern in corrected_display_patterns))
+    return display_value(decode_display_digits(list(map(encode_pattern, unique_signal_patterns)), list(map(encode_pattern, display_patterns))))
 
 
-if __name__ == '__main__':
-    display_numbers: list[int] = []
+def decode_note(note: str) -> list[int]:
+    patterns = note.split()
+    separator_index = patterns.index('|')
+    unique_pattern_masks = list(map(encode_pattern, patterns[:separator_index]))
+    display_pattern_masks = list(map(encode_pattern, patterns[separator_index + 1:]))
+    return decode_display_digits(unique_pattern_masks, display_pattern_masks)
+
+
+def decode_note_chunk(notes: list[str]) -> list[list[int]]:
+    return [decode_note(note) for note in notes if note]
+
+
+def decode_notes_in_parallel(notes: Iterable[str], chunk_size: int = CHUNK_SIZE, jobs: Optional[int] = None) -> Iterator[list[int]]:
+    return itertools.chain.from_iterable(map_chunks_in_parallel(decode_note_chunk, notes, jobs, chunk_size))
 
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        for line in file:
-            unique_signal_patterns, output = [[pattern for pattern in part.split()] for part in line.rstrip().split('|')]
-            display_numbers.append(decode_display(unique_signal_patterns, output))
 
-    count_of_1478 = sum(sum(1 for digit in str(number) if digit in '1478') for number in display_numbers)
-    print(f"How many times digits 1, 4, 7, or 8 appear:  {count_of_1478}")
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> Iterator[str]:
+    return (line for line in iter_lines(input_file_path) if line)
 
-    display_numbers_sum = sum(display_numbers)
-    print(f"Sum of all the output values:  {display_numbers_sum}")
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return sum(
+        sum(1 for digit in decode_note(note) if digit in (1, 4, 7, 8))
+        for note in parse_input(input_file_path)
+    )
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    return sum(display_value(decode_note(note)) for note in parse_input(input_file_path))
+
+
+if __name__ == '__main__':
+    print(f"How many times digits 1, 4, 7, or 8 appear:  {solve_part_1()}")
+    print(f"Sum of all the output values:  {solve_part_2()}")
@@ -1,76 +1,103 @@
 #!/usr/bin/env python
 
+from array import array
+import heapq
+import itertools
+import math
+import operator
 from pathlib import Path
-from typing import Optional
+import re
+from typing import Iterator
 
-
-FILE_PATH = Path(__file__)
+from puzzle_input import DigitGrid, read_digit_grid
 
 
-class Point:
-    def __init__(self, x: int, y: int, height: int) -> None:
-        self.x = x
-        self.y = y
-        self.height = height
-    
-    def __hash__(self) -> int:
-        return hash((self.x, self.y))
-
-
-def find_low_points(heightmap: list[list[Point]]) -> list[Point]:
-    low_points = []
-    for row in heightmap:
-        for point in row:
-            if (
-                (point.y == 0 or point.height < heightmap[point.y - 1][point.x].height)
-                and (point.y == (len(heightmap) - 1) or point.height < heightmap[point.y + 1][point.x].height)
-                and (point.x == 0 or point.height < heightmap[point.y][point.x - 1].height)
-                and (point.x == (len(heightmap[point.y]) - 1) or point.height < heightmap[point.y][point.x + 1].height)
-            ):
-                low_points.append(point)
-    return low_points
-
-
-def find_basin_points(heightmap: list[list[Point]], low_point: Point, found_basin_points: Optional[set[Point]] = None) -> set[Point]:
-    basin_points: set[Point] = set()
-    if found_basin_points:
-        basin_points.update(found_basin_points)
-    basin_points.add(low_point)
-
-    adjascent_points: list[Point] = []
-    if low_point.y > 0:
-        adjascent_points.append(heightmap[low_point.y - 1][low_point.x])
-    if low_point.y < (len(heightmap) - 1):
-        adjascent_points.append(heightmap[low_point.y + 1][low_point.x])
-    if low_point.x > 0:
-        adjascent_points.append(heightmap[low_point.y][low_point.x - 1])
-    if low_point.x < (len(heightmap[low_point.y]) - 1):
-        adjascent_points.append(heightmap[low_point.y][low_point.x + 1])
-
-    for adjascent_point in adjascent_points:
-        if (
-            adjascent_point.height >= low_point.height
-            and adjascent_point.height < 9
-            and adjascent_point not in basin_points
-        ):
-            basin_points.update(find_basin_points(heightmap, adjascent_point, basin_points))
-
-    return basin_points
+FILE_PATH = Path(__file__)
+INPUT_FILE_PATH = FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt'
+
+# Locations of height 9 aren't in any basin, so basins are made of runs of other heights along each row.
+BASIN_RUN_PATTERN = re.compile(rb'[\x00-\x08]+')
+# Beyond the edges of the heightmap is higher than any height.
+EDGE_HEIGHT = 10
+
+
+def find_low_points(heightmap: DigitGrid) -> Iterator[int]:
+    # Compares whole rows against their neighbouring rows and shifted copies of themselves, yielding cell indexes.
+    width = heightmap.width
+    edge_row = bytes([EDGE_HEIGHT]) * width
+    edge = bytes([EDGE_HEIGHT])
+    for y in range(heightmap.height):
+        row = heightmap.row(y)
+        row_above = heightmap.row(y - 1) if y > 0 else edge_row
+        row_below = heightmap.row(y + 1) if y < heightmap.height - 1 else edge_row
+        row_left = edge + row[:-1]
+        row_right = bytes(row[1:]) + edge
+        is_low_point = map(
+            operator.and_,
+            map(operator.and_, map(operator.lt, row, row_above), map(operator.lt, row, row_below)),
+            map(operator.and_, map(operator.lt, row, row_left), map(operator.lt, row, row_right))
+        )
+        yield from itertools.compress(range(y * width, (y + 1) * width), is_low_point)
+
+
+def find_basin_sizes(heightmap: DigitGrid) -> list[int]:
+    # Runs of basin locations are joined with union-find wherever they touch a run in the row above.
+    run_parents = array('l')
+    run_sizes = array('l')
+
+    def find_root(run: int) -> int:
+        while run_parents[run] != run:
+            run_parents[run] = run_parents[run_parents[run]]
+            run = run_parents[run]
+        return run
+
+    width = heightmap.width
+    previous_row_runs: list[tuple[int, int, int]] = []
+    for y in range(heightmap.height):
+        row_start = y * width
+        row_runs: list[tuple[int, int, int]] = []
+        previous_run_index = 0
+        for run_match in BASIN_RUN_PATTERN.finditer(heightmap.cells, row_start, row_start + width):
+            run_start, run_end = run_match.span()
+            run_start -= row_start
+            run_end -= row_start
+            run = len(run_sizes)
+            run_parents.append(run)
+            run_sizes.append(run_end - run_start)
+            row_runs.append((run_start, run_end, run))
+
+            # Skip the runs above that end before this one starts, then join every run above that overlaps it.
+            while previous_run_index < len(previous_row_runs) and previous_row_runs[previous_run_index][1] <= run_start:
+                previous_run_index += 1
+            overlapping_run_index = previous_run_index
+            while overlapping_run_index < len(previous_row_runs) and previous_row_runs[overlapping_run_index][0] < run_end:
+                root = find_root(run)
+                overlapping_root = find_root(previous_row_runs[overlapping_run_index][2])
+                if overlapping_root != root:
+                    if run_sizes[overlapping_root] < run_sizes[root]:
+                        root, overlapping_root = overlapping_root, root
+                    run_parents[root] = overlapping_root
+                    run_sizes[overlapping_root] += run_sizes[root]
+                overlapping_run_index += 1
+        previous_row_runs = row_runs
+
+    return [run_sizes[run] for run in range(len(run_parents)) if run_parents[run] == run]
+
+
+def parse_input(input_file_path: Path = INPUT_FILE_PATH) -> DigitGrid:
+    return read_digit_grid(input_file_path)
+
+
+def solve_part_1(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    heightmap = parse_input(input_file_path)
+    return sum(heightmap.cells[cell_index] + 1 for cell_index in find_low_points(heightmap))
+
+
+def solve_part_2(input_file_path: Path = INPUT_FILE_PATH) -> int:
+    heightmap = parse_input(input_file_path)
+    return math.prod(heapq.nlargest(3, find_basin_sizes(heightmap)))
 
 
 if __name__ == '__main__':
-    with open(FILE_PATH.parent / f'{FILE_PATH.stem}_input.txt') as file:
-        heightmap = [
-            [Point(x, y, int(height_str)) for x, height_str in enumerate(line.rstrip())]
-            for y, line in enumerate(file)
-        ]
-
-    low_points = find_low_points(heightmap)
-    risk_levels = [point.height + 1 for point in low_points]
-    risk_levels_sum = sum(risk_levels)
-    print(f"Sum of the risk levels of all low points:  {risk_levels_sum}")
-
-    basins = [find_basin_points(heightmap, low_point) for low_point in low_points]
-    basins.sort(key=lambda basin: len(basin), reverse=True)
-    largest_basins_product = len(basins[0]) * len(basins[1]) * len(basins[2])
-    print(f"Product of sizes of the three largest basins:  {largest_basins_product}")
+    print(f"Sum of the risk levels of all low points:  {solve_part_1()}")
+    print(f"Product of sizes of the three largest basins:  {solve_part_2()}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+from typing import Any, Callable
+
+
+# Event levels, from least to most verbose.
+QUIET = 0
+PROGRESS = 1
+DETAIL = 2
+
+
+class Event:
+    def __init__(self, level: int, message: str, details: dict[str, Any]) -> None:
+        self.level = level
+        self.message = message
+        self.details = details
+
+    def __str__(self) -> str:
+        return self.message.format(**self.details)
+
+
+EventHandler = Callable[[Event], None]
+
+event_handlers: list[tuple[int, EventHandler]] = []
+# The most verbose level any handler wants, so emitting an event nobody wants costs a single comparison.
+verbosity = QUIET
+
+
+def add_event_handler(handler: EventHandler, level: int = PROGRESS) -> None:
+    global verbosity
+    event_handlers.append((level, handler))
+    verbosity = max(verbosity, level)
+
+
+def remove_event_handler(handler: EventHandler) -> None:
+    global verbosity
+    event_handlers[:] = [(level, existing_handler) for level, existing_handler in event_handlers if existing_handler is not handler]
+    verbosity = max((level for level, _ in event_handlers), default=QUIET)
+
+
+def is_enabled(level: int) -> bool:
+    return level <= verbosity
+
+
+def emit(level: int, message: str, **details: Any) -> None:
+    if level > verbosity:
+        return
+    event = Event(level, message, details)
+    for handler_level, handler in event_handlers:
+        if level <= handler_level:
+            handler(event)
+
+
+def print_event(event: Event) -> None:
+    print(event)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+
+
+Matrix = list[list[int]]
+
+
+def identity_matrix(size: int) -> Matrix:
+    return [[int(row_index == column_index) for column_index in range(size)] for row_index in range(size)]
+
+
+def multiply_vector_by_matrix(vector: list[int], matrix: Matrix) -> list[int]:
+    # Zeros are skipped, so sparse vectors and matrices are cheap to multiply.
+    result = [0] * len(matrix[0])
+    for value, row in zip(vector, matrix):
+        if value:
+            for column_index, matrix_value in enumerate(row):
+                if matrix_value:
+                    result[column_index] += value * matrix_value
+    return result
+
+
+def multiply_matrices(matrix_a: Matrix, matrix_b: Matrix) -> Matrix:
+    return [multiply_vector_by_matrix(row_a, matrix_b) for row_a in matrix_a]
+
+
+def raise_matrix(matrix: Matrix, exponent: int) -> Matrix:
+    # Exponentiation by squaring.
+    result = identity_matrix(len(matrix))
+    while exponent:
+        if exponent & 1:
+            result = multiply_matrices(result, matrix)
+        exponent >>= 1
+        if exponent:
+            matrix = multiply_matrices(matrix, matrix)
+    return result
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import itertools
+import os
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+
+CHUNK_SIZE = 100000
+
+Item = TypeVar('Item')
+Result = TypeVar('Result')
+
+
+def map_in_parallel(
+    func: Callable[..., Result],
+    argument_tuples: Iterable[tuple],
+    jobs: Optional[int] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple = ()
+) -> Iterator[Result]:
+    # Results are yielded in the order of their arguments.  Only a couple of calls per worker are in flight, so huge
+    # inputs are never fully in memory, and arguments are taken lazily, so they can depend on the results so far.
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as executor:
+        max_pending_calls = (jobs or os.cpu_count() or 1) * 2
+        pending_results: deque[Future[Result]] = deque()
+        for arguments in argument_tuples:
+            pending_results.append(executor.submit(func, *arguments))
+            if len(pending_results) >= max_pending_calls:
+                yield pending_results.popleft().result()
+        while pending_results:
+            yield pending_results.popleft().result()
+
+
+def map_chunks_in_parallel(
+    func: Callable[[list[Item]], Result],
+    items: Iterable[Item],
+    jobs: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[Result]:
+    items = iter(items)
+    chunks = iter(lambda: list(itertools.islice(items, chunk_size)), [])
+    return map_in_parallel(func, ((chunk,) for chunk in chunks), jobs)
+
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+from array import array
+import contextlib
+import mmap
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+
+CHUNK_SIZE = 1024 * 1024
+
+# Maps ASCII digits to their values, so a digit grid is one byte per cell.
+DIGIT_VALUES = bytes.maketrans(b'0123456789', bytes(range(10)))
+
+
+class DigitGrid:
+    def __init__(self, cells: bytearray, width: int) -> None:
+        self.cells = cells
+        self.width = width
+        self.height = len(cells) // width if width else 0
+
+    def __getitem__(self, coordinates: tuple[int, int]) -> int:
+        x, y = coordinates
+        return self.cells[(y * self.width) + x]
+
+    def row(self, y: int) -> memoryview:
+        return memoryview(self.cells)[y * self.width:(y + 1) * self.width]
+
+    def rows(self) -> Iterator[memoryview]:
+        return (self.row(y) for y in range(self.height))
+
+
+@contextlib.contextmanager
+def map_file(file_path: Path) -> Iterator[Union[mmap.mmap, bytes]]:
+    with open(file_path, 'rb') as file:
+        # Empty files can't be memory-mapped.
+        if not file.seek(0, 2):
+            yield b''
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def iter_lines(file_path: Path) -> Iterator[str]:
+    with open(file_path) as file:
+        for line in file:
+            yield line.rstrip()
+
+
+def iter_byte_lines(file_path: Path) -> Iterator[bytes]:
+    with open(file_path, 'rb') as file:
+        for line in file:
+            yield line.rstrip(b'\r\n')
+
+
+def iter_ints(file_path: Path, separator: Optional[bytes] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[int]:
+    with map_file(file_path) as data:
+        remainder = b''
+        for chunk_start in range(0, len(data), chunk_size):
+            chunk = data[chunk_start:chunk_start + chunk_size]
+            tokens = (remainder + chunk).split(separator)
+            # The last token may continue in the next chunk, unless the chunk ended on whitespace that split() dropped.
+            remainder = b'' if separator is None and chunk[-1:].isspace() else tokens.pop()
+            for token in tokens:
+                if token.strip():
+                    yield int(token)
+        if remainder.strip():
+            yield int(remainder)
+
+
+def read_ints(file_path: Path, separator: Optional[bytes] = None) -> array:
+    return array('q', iter_ints(file_path, separator))
+
+
+def read_digit_grid(file_path: Path) -> DigitGrid:
+    with map_file(file_path) as data:
+        first_line_end = data.find(b'\n')
+        width = len(data[:first_line_end if first_line_end >= 0 else len(data)].rstrip(b'\r'))
+        cells = bytearray(data).translate(DIGIT_VALUES, b'\r\n')
+    return DigitGrid(cells, width)